@@ -2,27 +2,12 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 
-def shoreline_location_advanced(q_s, eta, t, S_t, S_f, S_b):
-    """Advanced shoreline location model with topset, foreset, basement slopes"""
-    # Ensure s=0 at t=0 and prevent division by zero or negative eta
-    s = np.zeros_like(t, dtype=float)
-    valid_mask = (eta > 0) & (t > 0)
-    
-    # Prevent invalid slope relationships
-    if S_t <= 0 or S_b <= 0 or S_f <= 0 or not (S_t < S_b < S_f):
-        return np.full_like(t, np.nan)
-    
-    if np.any(valid_mask):
-        alpha = S_t / (S_b - S_t)
-        beta = S_f / (S_f - S_b)
-        denom = S_b * (alpha + beta)
-        
-        with np.errstate(invalid='ignore', divide='ignore'):
-            sqrt_arg = (2 * q_s * t[valid_mask]) / denom
-            sqrt_arg = np.where(sqrt_arg < 0, 0, sqrt_arg)
-            s[valid_mask] = -eta[valid_mask] / S_b + np.sqrt(sqrt_arg)
-    
-    return s
+from shoreline import slope_feasibility
+from forcing import page_forcing
+from results import advanced_scenario
+from figures import add_envelope, cached_figures, cached_figure_dicts, emit_figures, overlay_figures, shared_axis_layouts
+from planform import lobe_shares, strike_gradient, run_planform, planform_heatmap, planform_animation
+from stratigraphy import synthetic_section, wheeler_diagram, section_figure, wheeler_figure
 
 # ----------------------
 # UI Helper Function
@@ -59,9 +44,16 @@ def create_input_widget(label, min_val, max_val, default_val, step, key, help_te
     
     return st.session_state[session_key]
 
-st.set_page_config(layout="wide")
-st.title("🏔️ Advanced Shoreline Model: Scenario Comparison with Slopes")
-st.markdown(r"""
+# Line colours of each scenario, in its separate and the combined figures
+SCENARIO_COLORS = {
+    1: {'shoreline': 'royalblue', 'sealevel': 'mediumseagreen', 'trajectory': 'purple'},
+    2: {'shoreline': 'firebrick', 'sealevel': 'darkorange', 'trajectory': 'green'},
+}
+
+# ----------------------
+# Streamlit UI
+# ----------------------
+INTRODUCTION = r"""
 This model uses the following equation with topset, foreset, and basement slopes:
 
 $$
@@ -87,10 +79,8 @@ $$
 
 Create complex sea-level scenarios by combining Linear and optional Sinusoidal components.
 Analyze the resulting shoreline changes from three different perspectives.
-""")
+"""
 
-# --- Input Columns ---
-col1, col2 = st.columns(2)
 
 def scenario_controls(scenario_num):
     """Creates all input controls for one scenario."""
@@ -119,128 +109,159 @@ def scenario_controls(scenario_num):
         if enable_s2:
             A2 = create_input_widget("Amplitude ($A_2$)", 0.0, 50.0, 5.0, 0.5, f"A2{scenario_num}")
             P2 = create_input_widget("Period ($P_2$)", 50, 500, 100, 10, f"P2{scenario_num}")
-    return q_s, tmax, S_t, S_f, S_b, Z0, Zdot, enable_s1, A1, P1, enable_s2, A2, P2
-
-with col1:
-    q_s1, tmax1, S_t1, S_f1, S_b1, Z01, Zdot1, enable_s1_1, A1_1, P1_1, enable_s2_1, A2_1, P2_1 = scenario_controls(1)
 
-with col2:
-    q_s2, tmax2, S_t2, S_f2, S_b2, Z02, Zdot2, enable_s1_2, A1_2, P1_2, enable_s2_2, A2_2, P2_2 = scenario_controls(2)
-
-# --- Options ---
-st.divider()
-opt_col1, opt_col2 = st.columns(2)
-with opt_col1:
-    plot_on_single_graph = st.checkbox("Plot on a single graph", value=False)
-with opt_col2:
-    align_axes = st.checkbox("Unify X/Y axis ranges", value=True, disabled=plot_on_single_graph)
-st.divider()
-
-# ----------------------
-# Calculation
-# ----------------------
-t1 = np.linspace(0, tmax1, 500)
-linear1 = Zdot1 * t1
-sinusoid1_1 = A1_1 * np.sin(2 * np.pi * t1 / P1_1) if enable_s1_1 and P1_1 > 0 else np.zeros_like(t1)
-sinusoid2_1 = A2_1 * np.sin(2 * np.pi * t1 / P2_1) if enable_s2_1 and P2_1 > 0 else np.zeros_like(t1)
-eta1 = Z01 + linear1 + sinusoid1_1 + sinusoid2_1
-s1 = shoreline_location_advanced(q_s1, eta1, t1, S_t1, S_f1, S_b1)
-
-t2 = np.linspace(0, tmax2, 500)
-linear2 = Zdot2 * t2
-sinusoid1_2 = A1_2 * np.sin(2 * np.pi * t2 / P1_2) if enable_s1_2 and P1_2 > 0 else np.zeros_like(t2)
-sinusoid2_2 = A2_2 * np.sin(2 * np.pi * t2 / P2_2) if enable_s2_2 and P2_2 > 0 else np.zeros_like(t2)
-eta2 = Z02 + linear2 + sinusoid1_2 + sinusoid2_2
-s2 = shoreline_location_advanced(q_s2, eta2, t2, S_t2, S_f2, S_b2)
-
-# Warn user if input is invalid for either scenario
-invalid1 = S_t1 <= 0 or S_b1 <= 0 or S_f1 <= 0 or not (S_t1 < S_b1 < S_f1)
-invalid2 = S_t2 <= 0 or S_b2 <= 0 or S_f2 <= 0 or not (S_t2 < S_b2 < S_f2)
-
-if invalid1:
-    st.error(r"Scenario 1 - Invalid input: $S_t < S_b < S_f$ and all must be positive.")
-if invalid2:
-    st.error(r"Scenario 2 - Invalid input: $S_t < S_b < S_f$ and all must be positive.")
-
-# ----------------------
-# Visualization
-# ----------------------
-if plot_on_single_graph and not (invalid1 or invalid2):
-    st.header("Combined Comparison Graphs")
-    # 1. Time vs Sea-level
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(x=t1, y=eta1, mode='lines', name="Scenario 1", line=dict(width=4, color='mediumseagreen')))
-    fig1.add_trace(go.Scatter(x=t2, y=eta2, mode='lines', name="Scenario 2", line=dict(width=4, color='darkorange')))
-    fig1.update_layout(title="1. Time vs. Sea Level", xaxis_title="Time (t)", yaxis_title="Sea Level (η)", template="plotly_white")
-
-    # 2. Time vs Shoreline Location
-    fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(x=t1, y=s1, mode='lines', name="Scenario 1", line=dict(width=4, color='royalblue')))
-    fig2.add_trace(go.Scatter(x=t2, y=s2, mode='lines', name="Scenario 2", line=dict(width=4, color='firebrick')))
-    fig2.update_layout(title="2. Time vs. Shoreline Position", xaxis_title="Time (t)", yaxis_title="Shoreline Position (s)", template="plotly_white")
-
-    # 3. Shoreline Location vs Sea-level
-    fig3 = go.Figure()
-    fig3.add_trace(go.Scatter(x=s1, y=eta1, mode='lines', name="Scenario 1", line=dict(width=4, color='purple')))
-    fig3.add_trace(go.Scatter(x=s2, y=eta2, mode='lines', name="Scenario 2", line=dict(width=4, color='green')))
-    fig3.update_layout(title="3. Shoreline Position vs. Sea Level", xaxis_title="Shoreline Position (s)", yaxis_title="Sea Level (η)", template="plotly_white")
-
-    # Unify axis ranges automatically
-    x_max_t = max(tmax1, tmax2)
-    y_max_eta = max(np.nanmax(eta1) if np.any(eta1) else 0, np.nanmax(eta2) if np.any(eta2) else 0) * 1.1
-    y_min_eta = min(np.nanmin(eta1) if np.any(eta1) else 0, np.nanmin(eta2) if np.any(eta2) else 0) * 1.1
-    fig1.update_xaxes(range=[0, x_max_t]); fig1.update_yaxes(range=[y_min_eta, y_max_eta])
-
-    y_max_s = max(np.nanmax(s1) if np.any(s1) else 0, np.nanmax(s2) if np.any(s2) else 0) * 1.1
-    y_min_s = min(np.nanmin(s1) if np.any(s1) else 0, np.nanmin(s2) if np.any(s2) else 0)
-    if y_min_s > 0: y_min_s = 0
-    fig2.update_xaxes(range=[0, x_max_t]); fig2.update_yaxes(range=[y_min_s, y_max_s])
-
-    fig3.update_xaxes(range=[y_min_s, y_max_s]); fig3.update_yaxes(range=[y_min_eta, y_max_eta])
-
-    st.plotly_chart(fig1, use_container_width=True)
-    st.plotly_chart(fig2, use_container_width=True)
-    st.plotly_chart(fig3, use_container_width=True)
-
-elif not (invalid1 or invalid2):
-    # --- Separated Graphs ---
-    def create_individual_figures(t, s, eta, scenario_num):
-        colors = {'shoreline': 'royalblue', 'sealevel': 'mediumseagreen', 'trajectory': 'purple'} if scenario_num == 1 else {'shoreline': 'firebrick', 'sealevel': 'darkorange', 'trajectory': 'green'}
-        
-        fig1 = go.Figure(go.Scatter(x=t, y=eta, mode='lines', name="Sea Level", line=dict(width=4, color=colors['sealevel'])))
-        fig1.update_layout(title=f"S{scenario_num}: 1. Time vs. Sea Level", xaxis_title="Time (t)", yaxis_title="Sea Level (η)", template="plotly_white")
-
-        fig2 = go.Figure(go.Scatter(x=t, y=s, mode='lines', name="Shoreline", line=dict(width=4, color=colors['shoreline'])))
-        fig2.update_layout(title=f"S{scenario_num}: 2. Time vs. Shoreline Position", xaxis_title="Time (t)", yaxis_title="Shoreline Position (s)", template="plotly_white")
-
-        fig3 = go.Figure(go.Scatter(x=s, y=eta, mode='lines', name="Trajectory", line=dict(width=4, color=colors['trajectory'])))
-        fig3.update_layout(title=f"S{scenario_num}: 3. Shoreline Position vs. Sea Level", xaxis_title="Shoreline Position (s)", yaxis_title="Sea Level (η)", template="plotly_white")
-        
-        return fig1, fig2, fig3
-
-    figs1 = create_individual_figures(t1, s1, eta1, 1)
-    figs2 = create_individual_figures(t2, s2, eta2, 2)
-
-    if align_axes:
-        x_max_t = max(tmax1, tmax2)
-        y_max_eta = max(np.nanmax(eta1) if np.any(eta1) else 0, np.nanmax(eta2) if np.any(eta2) else 0) * 1.1
-        y_min_eta = min(np.nanmin(eta1) if np.any(eta1) else 0, np.nanmin(eta2) if np.any(eta2) else 0) * 1.1
-        
-        y_max_s = max(np.nanmax(s1) if np.any(s1) else 0, np.nanmax(s2) if np.any(s2) else 0) * 1.1
-        y_min_s = min(np.nanmin(s1) if np.any(s1) else 0, np.nanmin(s2) if np.any(s2) else 0)
-        if y_min_s > 0: y_min_s = 0
-        
-        figs1[0].update_xaxes(range=[0, x_max_t]); figs1[0].update_yaxes(range=[y_min_eta, y_max_eta])
-        figs2[0].update_xaxes(range=[0, x_max_t]); figs2[0].update_yaxes(range=[y_min_eta, y_max_eta])
-        
-        figs1[1].update_xaxes(range=[0, x_max_t]); figs1[1].update_yaxes(range=[y_min_s, y_max_s])
-        figs2[1].update_xaxes(range=[0, x_max_t]); figs2[1].update_yaxes(range=[y_min_s, y_max_s])
-
-        figs1[2].update_xaxes(range=[y_min_s, y_max_s]); figs1[2].update_yaxes(range=[y_min_eta, y_max_eta])
-        figs2[2].update_xaxes(range=[y_min_s, y_max_s]); figs2[2].update_yaxes(range=[y_min_eta, y_max_eta])
-
-    graph_col1, graph_col2 = st.columns(2)
-    with graph_col1:
-        for fig in figs1: st.plotly_chart(fig, use_container_width=True)
-    with graph_col2:
-        for fig in figs2: st.plotly_chart(fig, use_container_width=True)
+    with st.expander("Uncertainty Ensemble", expanded=False):
+        enable_ens = st.checkbox("Show P5–P95 envelope", value=False, key=f"enable_ens_{scenario_num}")
+        n_members, spread = 0, 0
+        if enable_ens:
+            n_members = create_input_widget("Ensemble Members", 100, 100000, 2000, 100, f"nens{scenario_num}")
+            spread = create_input_widget("Parameter Spread (±%)", 1, 50, 10, 1, f"spread{scenario_num}")
+    return q_s, tmax, S_t, S_f, S_b, Z0, Zdot, enable_s1, A1, P1, enable_s2, A2, P2, enable_ens, n_members, spread
+
+
+def main(configure_page=True):
+    """Runs the advanced slope model page; app.py calls it with configure_page=False after its own set_page_config."""
+    if configure_page:
+        st.set_page_config(layout="wide")
+    st.title("🏔️ Advanced Shoreline Model: Scenario Comparison with Slopes")
+    st.markdown(INTRODUCTION)
+
+    # --- Input Columns ---
+    col1, col2 = st.columns(2)
+
+    with col1:
+        q_s1, tmax1, S_t1, S_f1, S_b1, Z01, Zdot1, enable_s1_1, A1_1, P1_1, enable_s2_1, A2_1, P2_1, enable_ens_1, n_members_1, spread_1 = scenario_controls(1)
+
+    with col2:
+        q_s2, tmax2, S_t2, S_f2, S_b2, Z02, Zdot2, enable_s1_2, A1_2, P1_2, enable_s2_2, A2_2, P2_2, enable_ens_2, n_members_2, spread_2 = scenario_controls(2)
+
+    # --- Options ---
+    st.divider()
+    opt_col1, opt_col2, opt_col3 = st.columns(3)
+    with opt_col1:
+        plot_on_single_graph = st.checkbox("Plot on a single graph", value=False)
+    with opt_col2:
+        align_axes = st.checkbox("Unify X/Y axis ranges", value=True, disabled=plot_on_single_graph)
+    with opt_col3:
+        adaptive_grid = st.checkbox("Adaptive time sampling", value=False, help="Concentrate the 500 time samples where the shoreline curve bends and where the water depth approaches zero")
+    st.divider()
+
+    # ----------------------
+    # Calculation
+    # ----------------------
+    # Each scenario (time grid, forcing, shoreline and P5–P95 envelope) is memoized across reruns
+    # and sessions, so toggling a display option or reloading the defaults recomputes nothing
+    traj1 = advanced_scenario(q_s1, tmax1, S_t1, S_f1, S_b1, Z01, Zdot1, A1_1, P1_1, A2_1, P2_1, adaptive_grid, n_members_1 if enable_ens_1 else 0, spread_1 / 100)
+    traj2 = advanced_scenario(q_s2, tmax2, S_t2, S_f2, S_b2, Z02, Zdot2, A1_2, P1_2, A2_2, P2_2, adaptive_grid, n_members_2 if enable_ens_2 else 0, spread_2 / 100)
+    t1, eta1, s1, band1 = traj1.t, traj1.eta, traj1.s, traj1.band
+    t2, eta2, s2, band2 = traj2.t, traj2.eta, traj2.s, traj2.band
+
+    # Warn user if input is invalid for either scenario
+    invalid1 = not slope_feasibility(S_t1, S_f1, S_b1)
+    invalid2 = not slope_feasibility(S_t2, S_f2, S_b2)
+
+    if invalid1:
+        st.error(r"Scenario 1 - Invalid input: $S_t < S_b < S_f$ and all must be positive.")
+    if invalid2:
+        st.error(r"Scenario 2 - Invalid input: $S_t < S_b < S_f$ and all must be positive.")
+
+    # ----------------------
+    # Visualization
+    # ----------------------
+    if plot_on_single_graph and not (invalid1 or invalid2):
+        st.header("Combined Comparison Graphs")
+
+        def create_combined_layers(t, s, eta, scenario_num, band=None):
+            """One scenario's traces of the three combined figures, overlaid with the other scenario's."""
+            colors = SCENARIO_COLORS[scenario_num]
+            name = f"Scenario {scenario_num}"
+            # 1. Time vs Sea-level
+            fig1 = go.Figure(go.Scatter(x=t, y=eta, mode='lines', name=name, line=dict(width=4, color=colors['sealevel'])))
+            if band: add_envelope(fig1, t, band['eta'], colors['sealevel'], f"{name} P5–P95")
+            fig1.update_layout(title="1. Time vs. Sea Level", xaxis_title="Time (t)", yaxis_title="Sea Level (η)", template="plotly_white")
+
+            # 2. Time vs Shoreline Location
+            fig2 = go.Figure(go.Scatter(x=t, y=s, mode='lines', name=name, line=dict(width=4, color=colors['shoreline'])))
+            if band: add_envelope(fig2, t, band['s'], colors['shoreline'], f"{name} P5–P95")
+            fig2.update_layout(title="2. Time vs. Shoreline Position", xaxis_title="Time (t)", yaxis_title="Shoreline Position (s)", template="plotly_white")
+
+            # 3. Shoreline Location vs Sea-level
+            fig3 = go.Figure(go.Scatter(x=s, y=eta, mode='lines', name=name, line=dict(width=4, color=colors['trajectory'])))
+            fig3.update_layout(title="3. Shoreline Position vs. Sea Level", xaxis_title="Shoreline Position (s)", yaxis_title="Sea Level (η)", template="plotly_white")
+            return fig1, fig2, fig3
+
+        # Each scenario's layers are rebuilt only when that scenario changes; the axis ranges are
+        # unified automatically from both scenarios' memoized extrema
+        layers1 = cached_figure_dicts((traj1,), ('combined', 1, tuple(SCENARIO_COLORS[1].values())), lambda: create_combined_layers(t1, s1, eta1, 1, band1))
+        layers2 = cached_figure_dicts((traj2,), ('combined', 2, tuple(SCENARIO_COLORS[2].values())), lambda: create_combined_layers(t2, s2, eta2, 2, band2))
+        for fig in emit_figures(overlay_figures(layers1, layers2), shared_axis_layouts((traj1, traj2), max(tmax1, tmax2))):
+            st.plotly_chart(fig, use_container_width=True)
+
+    elif not (invalid1 or invalid2):
+        # --- Separated Graphs ---
+        def create_individual_figures(t, s, eta, scenario_num, band=None):
+            colors = SCENARIO_COLORS[scenario_num]
+
+            fig1 = go.Figure(go.Scatter(x=t, y=eta, mode='lines', name="Sea Level", line=dict(width=4, color=colors['sealevel'])))
+            if band: add_envelope(fig1, t, band['eta'], colors['sealevel'])
+            fig1.update_layout(title=f"S{scenario_num}: 1. Time vs. Sea Level", xaxis_title="Time (t)", yaxis_title="Sea Level (η)", template="plotly_white")
+
+            fig2 = go.Figure(go.Scatter(x=t, y=s, mode='lines', name="Shoreline", line=dict(width=4, color=colors['shoreline'])))
+            if band: add_envelope(fig2, t, band['s'], colors['shoreline'])
+            fig2.update_layout(title=f"S{scenario_num}: 2. Time vs. Shoreline Position", xaxis_title="Time (t)", yaxis_title="Shoreline Position (s)", template="plotly_white")
+
+            fig3 = go.Figure(go.Scatter(x=s, y=eta, mode='lines', name="Trajectory", line=dict(width=4, color=colors['trajectory'])))
+            fig3.update_layout(title=f"S{scenario_num}: 3. Shoreline Position vs. Sea Level", xaxis_title="Shoreline Position (s)", yaxis_title="Sea Level (η)", template="plotly_white")
+
+            return fig1, fig2, fig3
+
+        # Unified ranges are applied on emit, so a change to one scenario leaves the other's
+        # cached figures untouched
+        layouts = shared_axis_layouts((traj1, traj2), max(tmax1, tmax2)) if align_axes else None
+        figs1 = cached_figures((traj1,), ('separate', 1, tuple(SCENARIO_COLORS[1].values())), lambda: create_individual_figures(t1, s1, eta1, 1, band1), layouts)
+        figs2 = cached_figures((traj2,), ('separate', 2, tuple(SCENARIO_COLORS[2].values())), lambda: create_individual_figures(t2, s2, eta2, 2, band2), layouts)
+
+        graph_col1, graph_col2 = st.columns(2)
+        with graph_col1:
+            for fig in figs1: st.plotly_chart(fig, use_container_width=True)
+        with graph_col2:
+            for fig in figs2: st.plotly_chart(fig, use_container_width=True)
+
+    # ----------------------
+    # Along-Strike Planform
+    # ----------------------
+    st.divider()
+    with st.expander("Along-Strike Planform (Scenario 1)", expanded=False):
+        st.markdown("Runs Scenario 1 for many along-strike columns that share its sea-level history but differ in supply share, basement slope and initial depth.")
+        enable_planform = st.checkbox("Run planform mode", value=False, key="enable_planform")
+        if enable_planform:
+            n_columns = create_input_widget("Along-Strike Columns ($M$)", 10, 10000, 200, 10, "ncols")
+            lobe_width = create_input_widget("Supply Lobe Width (fraction of strike)", 0.05, 1.0, 0.25, 0.05, "lobe_width")
+            sb_change = create_input_widget("Basement Slope Variation (±%)", 0, 50, 20, 1, "sb_change")
+            z0_change = create_input_widget("Initial Depth Variation (±%)", 0, 50, 20, 1, "z0_change")
+
+            t_plan = np.linspace(0, tmax1, 500)
+            shared_sea_level = page_forcing(0.0, Zdot1, A1_1, P1_1, A2_1, P2_1)
+            X_plan, feasible = run_planform('advanced', t_plan, shared_sea_level, q_s1 * n_columns, lobe_shares(n_columns, 0.5, lobe_width),
+                                            strike_gradient(n_columns, Z01, z0_change / 100), strike_gradient(n_columns, S_b1, sb_change / 100), S_t1, S_f1, dtype=np.float32)
+            if not feasible.all():
+                st.warning(f"{int((~feasible).sum())} columns break $S_t < S_b < S_f$ and are left blank.")
+            st.plotly_chart(planform_heatmap(t_plan, X_plan), use_container_width=True)
+            st.plotly_chart(planform_animation(t_plan, X_plan), use_container_width=True)
+
+    # ----------------------
+    # Synthetic Stratigraphy
+    # ----------------------
+    with st.expander("Synthetic Stratigraphy & Wheeler Diagram (Scenario 1)", expanded=False):
+        st.markdown("Builds the dip section left by Scenario 1's trajectory (deposition age per cell) and its chronostratigraphic (Wheeler) diagram. Nothing is eroded; stranded deposits stay in place.")
+        enable_strat = st.checkbox("Build stratigraphy", value=False, key="enable_strat", disabled=invalid1)
+        if enable_strat and not invalid1:
+            resolution = create_input_widget("Grid Resolution (cells per axis)", 100, 1000, 400, 50, "strat_res")
+            section = synthetic_section(t1, s1, eta1, S_t1, S_f1, S_b1, nx=resolution, nz=resolution, memory_budget=32 * 2**20)
+            wheeler = wheeler_diagram(t1, s1, eta1, S_t1, S_f1, S_b1, nx=resolution, memory_budget=32 * 2**20)
+            st.plotly_chart(section_figure(section, eta1[-1]), use_container_width=True)
+            st.plotly_chart(wheeler_figure(wheeler, s1), use_container_width=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
 import streamlit as st
 
+import advancedbox
+import simplebox
+
+PAGES = {
+    "Simple Box Model": simplebox.main,
+    "Advanced Model with Slopes": advancedbox.main,
+}
+
 # Set page config
 st.set_page_config(
     page_title="Delta Shoreline Model",
@@ -14,16 +22,12 @@ st.sidebar.markdown("Choose a model to explore:")
 
 model_choice = st.sidebar.radio(
     "Select Model:",
-    ["Simple Box Model", "Advanced Model with Slopes"],
+    list(PAGES),
     index=0
 )
 
-if model_choice == "Simple Box Model":
-    # Import and run simple model
-    exec(open('simplebox.py').read())
-else:
-    # Import and run advanced model
-    exec(open('advancedbox.py').read())
+# The pages are imported modules, compiled once per process; a rerun only calls the entry point
+PAGES[model_choice](configure_page=False)
 
 # Footer
 st.sidebar.markdown("---")
@@ -0,0 +1,130 @@
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ----------------------
+# Rerun Latency
+# ----------------------
+# The dispatch app.py used before the pages became importable modules: every rerun read the
+# page's source, compiled it and exec'd it (calling st.set_page_config a second time).
+EXEC_APP = '''
+import streamlit as st
+st.set_page_config(page_title="Delta Shoreline Model", page_icon="🏔️", layout="wide", initial_sidebar_state="expanded")
+model_choice = st.sidebar.radio("Select Model:", ["Simple Box Model", "Advanced Model with Slopes"], index=0)
+if model_choice == "Simple Box Model":
+    exec(open({simple!r}).read())
+else:
+    exec(open({advanced!r}).read())
+'''
+
+
+def _app(dispatch, page):
+    if dispatch == 'exec':
+        source = EXEC_APP.format(simple=os.path.join(HERE, 'simplebox.py'), advanced=os.path.join(HERE, 'advancedbox.py'))
+        app = AppTest.from_string(source, default_timeout=120)
+    else:
+        app = AppTest.from_file(os.path.join(HERE, 'app.py'), default_timeout=120)
+    app.run()
+    app.sidebar.radio[0].set_value(page).run()
+    return app
+
+
+def rerun_latency(n_reruns=20):
+    """Median rerun wall time (ms) per page for the exec dispatch and the module dispatch.
+
+    Both apps run in this process, so they share the warm result and figure caches and the
+    difference is the dispatch itself. Reruns of the two apps are interleaved.
+    """
+    results = {}
+    for page in ("Simple Box Model", "Advanced Model with Slopes"):
+        apps = {dispatch: _app(dispatch, page) for dispatch in ('exec', 'module')}
+        times = {dispatch: [] for dispatch in apps}
+        for _ in range(n_reruns):
+            for dispatch, app in apps.items():
+                start = time.perf_counter()
+                app.run()
+                times[dispatch].append(time.perf_counter() - start)
+            if any(app.exception for app in apps.values()):
+                raise RuntimeError(f"{page} raised: {[e.value for app in apps.values() for e in app.exception]}")
+        results[page] = {dispatch: 1e3 * float(np.median(values)) for dispatch, values in times.items()}
+    return results
+
+
+def compile_cost(n=50):
+    """Median time (ms) to read and compile each page from source, the part the modules skip."""
+    cost = {}
+    for name in ('simplebox.py', 'advancedbox.py'):
+        path = os.path.join(HERE, name)
+        times = []
+        for _ in range(n):
+            start = time.perf_counter()
+            with open(path) as f:
+                compile(f.read(), path, 'exec')
+            times.append(time.perf_counter() - start)
+        cost[name] = 1e3 * float(np.median(times))
+    return cost
+
+# ----------------------
+# Kernel Allocations
+# ----------------------
+def _peak_bytes(call, n_calls):
+    """Median peak of traced memory (bytes) above the starting level during call()."""
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(n_calls):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            result = call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            del result
+    finally:
+        tracemalloc.stop()
+    return float(np.median(peaks))
+
+
+def kernel_allocations(n_scenarios=1000, n_time=500, n_calls=5, seed=0):
+    """Peak bytes allocated per call by run_*_batch and by run_*_into with a reused KernelWorkspace.
+
+    NumPy reports its array buffers to tracemalloc, so the peak counts every (N, T)
+    temporary. The workspace is allocated (and both paths warmed up) before tracing,
+    as on a page rerun.
+    """
+    from shoreline import KernelWorkspace, run_advanced_batch, run_advanced_into, run_simple_batch, run_simple_into
+
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 100, n_time)
+    forcing = dict(Z0=rng.uniform(0.5, 5, n_scenarios), Zdot=rng.uniform(-0.05, 0.05, n_scenarios),
+                   A1=rng.uniform(0, 2, n_scenarios), P1=rng.uniform(10, 50, n_scenarios))
+    slopes = dict(S_t=rng.uniform(0.001, 0.02, n_scenarios), S_f=rng.uniform(0.2, 1, n_scenarios), S_b=rng.uniform(0.02, 0.1, n_scenarios))
+    runs = {
+        'simple': (lambda: run_simple_batch(t, Qs=250.0, **forcing), lambda ws: run_simple_into(t, Qs=250.0, **forcing, workspace=ws)),
+        'advanced': (lambda: run_advanced_batch(t, q_s=1.0, **slopes, **forcing), lambda ws: run_advanced_into(t, q_s=1.0, **slopes, **forcing, workspace=ws)),
+    }
+    results = {}
+    for model, (batch, into) in runs.items():
+        workspace = KernelWorkspace((n_scenarios, n_time))
+        batch(), into(workspace)
+        results[model] = {'batch': _peak_bytes(batch, n_calls), 'into': _peak_bytes(lambda: into(workspace), n_calls)}
+    return results
+
+
+if __name__ == '__main__':
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, HERE)
+    n_reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for model, row in kernel_allocations().items():
+        print(f"peak allocation per call {model:<9} run_{model}_batch {row['batch'] / 2**20:8.2f} MiB   "
+              f"run_{model}_into {row['into'] / 2**20:8.2f} MiB")
+    for name, ms in compile_cost().items():
+        print(f"read + compile {name:<15} {ms:8.2f} ms")
+    for page, row in rerun_latency(n_reruns).items():
+        saving = row['exec'] - row['module']
+        print(f"{page:<28} exec {row['exec']:8.2f} ms   module {row['module']:8.2f} ms   saving {saving:7.2f} ms ({100 * saving / row['exec']:.0f}%)")
@@ -0,0 +1,123 @@
+import numpy as np
+
+from shoreline import slope_feasibility, shoreline_location_jacobian, shoreline_location_advanced_jacobian
+from sweep import ADVANCED_DEFAULTS
+
+ADVANCED_PARAMS = ('q_s', 'S_t', 'S_f', 'S_b')
+
+# Largest change of any log-parameter in one Levenberg-Marquardt step
+MAX_LOG_STEP = 0.3
+
+# ----------------------
+# Observation Handling
+# ----------------------
+def _observations(t, observed, eta):
+    """Broadcasts an observed record to (N, T) arrays; NaN marks missing samples (ragged records)."""
+    observed = np.atleast_2d(np.asarray(observed, dtype=float))
+    t = np.broadcast_to(np.asarray(t, dtype=float), observed.shape)
+    eta = np.broadcast_to(np.asarray(eta, dtype=float), observed.shape)
+    mask = np.isfinite(observed) & np.isfinite(t) & np.isfinite(eta)
+    return t, np.where(mask, observed, 0.0), np.where(mask, eta, 0.0), mask
+
+
+def _rmse(residual, mask):
+    return np.sqrt((residual ** 2).sum(axis=1) / np.maximum(mask.sum(axis=1), 1))
+
+# ----------------------
+# Simple Box Model
+# ----------------------
+def calibrate_simple(t, X_obs, eta):
+    """Least-squares Qs for N independent records of the simple box model.
+
+    t, X_obs and eta are (T,) or (N, T); NaN entries are ignored. X = Qs * t / eta is
+    linear in Qs, so the fit is the closed-form normal equation Qs = <g, X> / <g, g>
+    with g = dX/dQs = t / eta on the valid samples. Returns (Qs, rmse), each (N,).
+    """
+    t, X_obs, eta, mask = _observations(t, X_obs, eta)
+    g = np.where(mask, shoreline_location_jacobian(1.0, eta, t)[1]['Qs'], 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Qs = (g * X_obs).sum(axis=1) / (g * g).sum(axis=1)
+    residual = np.where(mask, Qs[:, None] * g - X_obs, 0.0)
+    return Qs, _rmse(residual, mask)
+
+# ----------------------
+# Advanced Model with Slopes
+# ----------------------
+def calibrate_advanced(t, s_obs, eta, initial=None, free=ADVANCED_PARAMS, max_iter=100, tol=1e-10):
+    """Batched Levenberg-Marquardt fit of (q_s, S_t, S_f, S_b) to N observed shoreline records.
+
+    t, s_obs and eta are (T,) or (N, T); NaN entries are ignored. initial maps parameter
+    names to scalars or (N,) starting values (page defaults otherwise); parameters not in
+    free are held at their initial value. All N problems are solved together with analytic
+    Jacobians and batched normal equations, so there is no Python loop per problem.
+
+    Note that s(t) depends on the slopes only through S_b and q_s / (S_b (alpha + beta)),
+    so a single record cannot separate q_s, S_t and S_f; damping and the step limit keep the
+    unidentified directions near their initial values. Fix the ones you know via free.
+    Returns a dict with the fitted (N,) parameters, 'rmse', 'converged' and 'iterations'.
+    """
+    unknown = set(free) - set(ADVANCED_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters for the advanced model: {sorted(unknown)}")
+    t, s_obs, eta, mask = _observations(t, s_obs, eta)
+    N = s_obs.shape[0]
+    start = {**{k: ADVANCED_DEFAULTS[k] for k in ADVANCED_PARAMS}, **(initial or {})}
+    start = [np.broadcast_to(np.asarray(start[k], dtype=float), (N,)) for k in ADVANCED_PARAMS]
+    if not np.all(slope_feasibility(*start[1:])):
+        raise ValueError("Initial slopes must satisfy 0 < S_t < S_b < S_f")
+
+    # Parameters are fitted in log space (keeps them positive); trial steps that break
+    # S_t < S_b < S_f are rejected like any other uphill step, raising the damping.
+    columns = [k for k, name in enumerate(ADVANCED_PARAMS) if name in free]
+
+    def evaluate(u):
+        params = np.exp(u)
+        q_s, S_t, S_f, S_b = params.T
+        s, _, d_s = shoreline_location_advanced_jacobian(q_s, eta, t, S_t, S_f, S_b)
+        residual = np.where(mask, s - s_obs, 0.0)
+        jac = np.stack([d_s[name] for name in ADVANCED_PARAMS], axis=-1) * params[:, None, :]
+        jac = np.where(mask[..., None], jac, 0.0)[..., columns]
+        return residual, jac
+
+    u = np.log(np.stack(start, axis=-1))
+    residual, jac = evaluate(u)
+    cost = (residual ** 2).sum(axis=1)
+    lam = np.full(N, 1e-3)
+    active = np.ones(N, dtype=bool)
+    iterations = np.zeros(N, dtype=int)
+    eye = np.eye(len(columns))
+
+    for _ in range(max_iter):
+        JtJ = np.einsum('ntp,ntq->npq', jac, jac)
+        grad = np.einsum('ntp,nt->np', jac, residual)
+        damping = lam[:, None, None] * (JtJ * eye + 1e-12 * eye)
+        step = -(np.linalg.pinv(JtJ + damping) @ grad[..., None])[..., 0]
+        # Trust radius in log space: the slopes are only weakly identified, and long
+        # steps tend to drive S_t, S_b and S_f together onto the feasibility boundary
+        step *= np.minimum(1, MAX_LOG_STEP / np.maximum(np.abs(step).max(axis=1), 1e-300))[:, None]
+        trial = u.copy()
+        trial[:, columns] += np.where(active[:, None], step, 0.0)
+        feasible = slope_feasibility(*np.exp(trial[:, 1:]).T)
+        trial[~feasible] = u[~feasible]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            trial_residual, trial_jac = evaluate(trial)
+        trial_cost = np.where(feasible, (trial_residual ** 2).sum(axis=1), np.inf)
+
+        better = active & (trial_cost < cost)
+        converged = better & (cost - trial_cost <= tol * np.maximum(cost, 1e-300))
+        converged |= active & (np.abs(step).max(axis=1) < 1e-12)
+        u[better] = trial[better]
+        residual[better] = trial_residual[better]
+        jac[better] = trial_jac[better]
+        cost[better] = trial_cost[better]
+        lam = np.where(better, lam / 10, np.minimum(lam * 10, 1e12))
+        iterations += active
+        active &= ~converged
+        if not active.any():
+            break
+
+    q_s, S_t, S_f, S_b = np.exp(u).T
+    return {
+        'q_s': q_s, 'S_t': S_t, 'S_f': S_f, 'S_b': S_b,
+        'rmse': _rmse(residual, mask), 'converged': ~active, 'iterations': iterations,
+    }
@@ -0,0 +1,188 @@
+import numpy as np
+
+from feasibility import around_slopes
+from shoreline import slope_feasibility
+from sweep import check_model
+
+# ----------------------
+# Parameter Distributions
+# ----------------------
+# A distribution is a callable (rng, n) -> array of n draws; plain numbers are held fixed.
+# A tuple of names maps to a joint distribution returning one array per name, e.g.
+# {('S_t', 'S_f', 'S_b'): SlopeIndex.distribution()} for slope triples that are all feasible.
+def uniform(low, high):
+    """Uniform distribution on [low, high]."""
+    return lambda rng, n: rng.uniform(low, high, n)
+
+
+def normal(mean, std):
+    """Normal distribution with the given mean and standard deviation."""
+    return lambda rng, n: rng.normal(mean, std, n)
+
+
+def around(params, spread):
+    """Uniform +/- spread (as a fraction) around each value in params, e.g. the slider settings."""
+    return {name: uniform(value * (1 - spread), value * (1 + spread)) for name, value in params.items()}
+
+
+def around_feasible(params, spread):
+    """around(params, spread), with the slopes drawn jointly from their feasible +/- spread grid.
+
+    Plain around() draws each slope independently, and members breaking S_t < S_b < S_f are
+    then dropped; here every member is feasible, so n_members are all used.
+    """
+    slopes = ('S_t', 'S_f', 'S_b')
+    distributions = around({name: value for name, value in params.items() if name not in slopes}, spread)
+    distributions[slopes] = around_slopes(*(params[name] for name in slopes), spread).distribution()
+    return distributions
+
+
+def draw(distributions, rng, n):
+    """Draws n members from a dict of distributions; fixed values are passed through."""
+    members = {}
+    for name, dist in distributions.items():
+        if isinstance(name, tuple):
+            members.update(zip(name, dist(rng, n)))
+        else:
+            members[name] = dist(rng, n) if callable(dist) else dist
+    return members
+
+# ----------------------
+# Streaming Estimators
+# ----------------------
+class StreamingStats:
+    """Running mean, variance and histogram quantiles of trajectories, with O(T) memory.
+
+    Batches of shape (n, T) are merged with Chan's parallel update for the mean and
+    variance. Quantiles come from a fixed number of histogram bins per time step,
+    whose range is set from the first batch (padded by half its spread on each side).
+    When a later batch falls outside a time step's range, that range is doubled,
+    merging pairs of bins so the counts stay exact, until it holds the batch. Quantile
+    resolution is one bin width of the final range, and results are clipped to the
+    exact running min/max.
+    """
+
+    def __init__(self, n_time, bins=512):
+        self.bins = bins
+        self.count = 0
+        self.mean = np.zeros(n_time)
+        self._m2 = np.zeros(n_time)
+        self.min = np.full(n_time, np.inf)
+        self.max = np.full(n_time, -np.inf)
+        self._counts = np.zeros((bins, n_time), dtype=np.int64)
+        self._lo = None
+        self._width = None
+
+    def update(self, batch):
+        """Adds a (n, T) batch of trajectories; rows containing NaN (infeasible members) are skipped."""
+        batch = np.asarray(batch, dtype=float)
+        batch = batch[~np.isnan(batch).any(axis=1)]
+        n = batch.shape[0]
+        if n == 0:
+            return
+
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        batch_min, batch_max = batch.min(axis=0), batch.max(axis=0)
+        np.minimum(self.min, batch_min, out=self.min)
+        np.maximum(self.max, batch_max, out=self.max)
+
+        if self._lo is None:
+            pad = 0.5 * (batch_max - batch_min)
+            self._lo = batch_min - pad
+            self._width = np.maximum((batch_max + pad - self._lo) / self.bins, 1e-12)
+        else:
+            self._widen(batch_min, batch_max)
+
+        idx = ((batch - self._lo) / self._width).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        n_time = self.mean.size
+        idx *= n_time
+        idx += np.arange(n_time)
+        self._counts += np.bincount(idx.ravel(), minlength=self.bins * n_time).reshape(self.bins, n_time)
+
+    def _widen(self, low, high):
+        # Doubles the bin width of every time step whose range misses [low, high]: old bin
+        # pairs merge into one new bin, and the range grows downwards if low is below it
+        # and upwards otherwise, until every time step holds its values.
+        half = (self.bins + 1) // 2
+        while True:
+            below = low < self._lo
+            above = high >= self._lo + self.bins * self._width
+            cols = np.flatnonzero(below | above)
+            if cols.size == 0:
+                return
+            counts = self._counts[:, cols]
+            if self.bins % 2:
+                counts = np.vstack([counts, np.zeros((1, cols.size), dtype=np.int64)])
+            merged = counts.reshape(half, 2, cols.size).sum(axis=1)
+            down = below[cols]
+            self._counts[:, cols] = 0
+            self._counts[:half, cols[~down]] = merged[:, ~down]
+            self._counts[self.bins - half:, cols[down]] = merged[:, down]
+            self._lo[cols[down]] -= 2 * (self.bins - half) * self._width[cols[down]]
+            self._width[cols] *= 2
+
+    @property
+    def variance(self):
+        """Sample variance at each time step."""
+        return self._m2 / max(self.count - 1, 1)
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1) at each time step."""
+        if self.count == 0:
+            return np.full(self.mean.size, np.nan)
+        cum = self._counts.cumsum(axis=0)
+        target = q * self.count
+        idx = np.minimum((cum < target).sum(axis=0), self.bins - 1)
+        cols = np.arange(self.mean.size)
+        before = np.where(idx > 0, cum[idx - 1, cols], 0)
+        in_bin = np.maximum(self._counts[idx, cols], 1)
+        frac = np.clip((target - before) / in_bin, 0, 1)
+        return np.clip(self._lo + (idx + frac) * self._width, self.min, self.max)
+
+# ----------------------
+# Ensemble Runner
+# ----------------------
+def run_ensemble(model, distributions, t, n_members, batch_size=10000, bins=512, seed=None):
+    """Runs a Monte Carlo ensemble in batches; returns StreamingStats for 'eta' and the shoreline.
+
+    model is 'simple' or 'advanced'; distributions maps the keyword names of
+    run_simple_batch / run_advanced_batch to distributions or fixed values. The
+    shoreline statistics are stored under 'X' (simple) or 's' (advanced). Members with
+    a non-finite eta or shoreline (e.g. infeasible slopes) are left out of both. Memory
+    is O(batch_size * T + bins * T), independent of n_members.
+    """
+    run, _ = check_model(model, [name for key in distributions for name in (key if isinstance(key, tuple) else (key,))])
+    t = np.asarray(t, dtype=float)
+    rng = np.random.default_rng(seed)
+    shoreline_key = 'X' if model == 'simple' else 's'
+    stats = {'eta': StreamingStats(t.size, bins), shoreline_key: StreamingStats(t.size, bins)}
+
+    for start in range(0, n_members, batch_size):
+        n = min(batch_size, n_members - start)
+        result = run(t, **draw(distributions, rng, n))
+        eta, shoreline = np.broadcast_arrays(result[0], result[1])
+        # Both statistics describe the same members
+        members = np.isfinite(eta).all(axis=1) & np.isfinite(shoreline).all(axis=1)
+        stats['eta'].update(eta[members])
+        stats[shoreline_key].update(shoreline[members])
+
+    return stats
+
+
+def envelope(model, params, t, n_members, spread, quantiles=(0.05, 0.95), seed=0):
+    """Quantile bands of eta and the shoreline for a +/- spread ensemble around params.
+
+    Returns a dict mapping 'eta' and 'X'/'s' to a tuple of arrays, one per quantile.
+    """
+    feasible_slopes = model == 'advanced' and spread > 0 and slope_feasibility(params['S_t'], params['S_f'], params['S_b'])
+    distributions = around_feasible(params, spread) if feasible_slopes else around(params, spread)
+    stats = run_ensemble(model, distributions, t, n_members, seed=seed)
+    return {key: tuple(s.quantile(q) for q in quantiles) for key, s in stats.items()}
@@ -0,0 +1,148 @@
+import numpy as np
+
+from shoreline import as_columns, sea_level, sea_level_batch, sea_level_rate, slope_denominator
+from sweep import check_model
+
+EVENT_KINDS = ('eta_zero', 'turning', 'threshold')
+FORCING = ('Z0', 'Zdot', 'A1', 'P1', 'A2', 'P2')
+
+# One row per event; direction is the sign of the change of the event function:
+# eta_zero +1 = flooding / -1 = drying, turning -1 = regression -> transgression
+# (maximum of X) / +1 = transgression -> regression, threshold +1 = passing seaward.
+# shoreline is the position at the event time; at eta_zero events it is 0, as the
+# models return for eta <= 0.
+EVENT_DTYPE = np.dtype([
+    ('scenario', np.int64),
+    ('kind', 'U9'),
+    ('time', float),
+    ('shoreline', float),
+    ('level', float),
+    ('direction', np.int8),
+])
+
+# ----------------------
+# Pointwise Closed Forms
+# ----------------------
+# p maps parameter names to arrays that broadcast against t: (N, 1) columns for the
+# sampled batch, or (M,) per-bracket values during refinement.
+def _forcing(p):
+    return tuple(p[name] for name in FORCING)
+
+
+def _advanced_rate(p):
+    """2 q_s / (S_b (alpha + beta)), the coefficient under the square root; NaN for infeasible slopes."""
+    return 2 * p['q_s'] / slope_denominator(p['S_t'], p['S_f'], p['S_b'])
+
+
+def _shoreline(model, p, t, eta=None):
+    eta = sea_level(t, *_forcing(p)) if eta is None else eta
+    valid = (eta > 0) & (t > 0)
+    safe_eta = np.where(valid, eta, 1.0)
+    if model == 'simple':
+        return np.where(valid, p['Qs'] * t / safe_eta, 0.0)
+    return np.where(valid, np.sqrt(np.maximum(_advanced_rate(p) * t, 0)) - eta / p['S_b'], 0.0)
+
+
+def _event_function(model, kind, p, t, level, eta=None):
+    """Function whose roots are the events; NaN where the event is undefined."""
+    eta = sea_level(t, *_forcing(p)) if eta is None else eta
+    if kind == 'eta_zero':
+        return eta
+    defined = (eta > 0) & (t > 0)
+    if kind == 'turning':
+        if model == 'simple':
+            # dX/dt = Qs (eta - t eta') / eta^2, so the sign follows eta - t eta'
+            g = eta - t * sea_level_rate(t, *_forcing(p))
+        else:
+            # ds/dt = sqrt(rate) / (2 sqrt(t)) - eta' / S_b
+            g = np.sqrt(_advanced_rate(p) / np.where(t > 0, t, 1.0)) / 2 - sea_level_rate(t, *_forcing(p)) / p['S_b']
+    else:
+        g = _shoreline(model, p, t, eta) - level
+    return np.where(defined, g, np.nan)
+
+# ----------------------
+# Bracketed Root Refinement
+# ----------------------
+def _refine(f, a, b, fa, fb, tol, max_iter):
+    """Vectorized Illinois (modified regula falsi) with bisection fallback on brackets [a, b]."""
+    side = np.zeros(a.shape, dtype=np.int8)
+    for _ in range(max_iter):
+        open_ = np.abs(b - a) > tol
+        if not open_.any():
+            break
+        with np.errstate(invalid='ignore', divide='ignore'):
+            c = b - fb * (b - a) / (fb - fa)
+        bad = ~np.isfinite(c) | (c <= np.minimum(a, b)) | (c >= np.maximum(a, b))
+        c = np.where(bad, 0.5 * (a + b), c)
+        fc = f(c)
+        left = np.signbit(fc) == np.signbit(fa)
+        # Illinois step: halve the retained end's value when the same end is kept twice
+        fb = np.where(open_ & left & (side == 1), 0.5 * fb, fb)
+        fa = np.where(open_ & ~left & (side == -1), 0.5 * fa, fa)
+        a, fa = np.where(open_ & left, c, a), np.where(open_ & left, fc, fa)
+        b, fb = np.where(open_ & ~left, c, b), np.where(open_ & ~left, fc, fb)
+        side = np.where(open_, np.where(left, 1, -1), side).astype(np.int8)
+    return 0.5 * (a + b)
+
+
+def detect_events(model, t, params, levels=(), kinds=EVENT_KINDS, tol=1e-9, max_iter=200):
+    """Finds sea-level zero crossings, shoreline turning points and threshold crossings.
+
+    model is 'simple' or 'advanced' and params maps the keyword names of run_simple_batch
+    / run_advanced_batch to scalars or (N,) arrays (page defaults otherwise). The (N, T)
+    batch on the time axis t is only used to bracket sign changes of each event function;
+    every event is then refined on the closed form to an absolute time tolerance tol.
+    levels lists shoreline positions for 'threshold' events. Returns a structured array
+    of EVENT_DTYPE sorted by scenario and time. Brackets that straddle a jump of the
+    validity mask rather than a root are discarded.
+    """
+    _, defaults = check_model(model, params)
+    unknown = set(kinds) - set(EVENT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown event kinds: {sorted(unknown)}")
+    params = {**defaults, **params}
+    names = list(params)
+    columns = dict(zip(names, as_columns(*(params[name] for name in names))))
+    t = np.asarray(t, dtype=float)
+    eta = sea_level_batch(t, *_forcing(params))
+
+    tables = []
+    jobs = [(kind, np.nan) for kind in kinds if kind != 'threshold']
+    if 'threshold' in kinds:
+        jobs += [('threshold', float(level)) for level in levels]
+    for kind, level in jobs:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g = _event_function(model, kind, columns, t, level, eta)
+        lo, hi = g[:, :-1], g[:, 1:]
+        rows, idx = np.nonzero((np.signbit(lo) != np.signbit(hi)) & np.isfinite(lo) & np.isfinite(hi))
+        if rows.size == 0:
+            continue
+        p = {name: col[rows, 0] if col.shape[0] > 1 else np.broadcast_to(col[0, 0], rows.shape) for name, col in columns.items()}
+
+        def f(x):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return _event_function(model, kind, p, x, level)
+
+        root = _refine(f, t[idx], t[idx + 1], lo[rows, idx], hi[rows, idx], tol, max_iter)
+        # A genuine root leaves a residual far below the bracket's end values
+        residual = np.abs(f(root))
+        scale = np.maximum(np.abs(lo[rows, idx]), np.abs(hi[rows, idx]))
+        keep = residual <= 1e-6 * scale + 1e-12
+
+        table = np.empty(int(keep.sum()), dtype=EVENT_DTYPE)
+        table['scenario'] = rows[keep]
+        table['kind'] = kind
+        table['time'] = root[keep]
+        if kind == 'eta_zero':
+            # The closed forms are singular at eta = 0; report the models' value for eta <= 0
+            table['shoreline'] = 0.0
+        else:
+            table['shoreline'] = _shoreline(model, {k: v[keep] for k, v in p.items()}, root[keep])
+        table['level'] = level
+        table['direction'] = np.where(hi[rows, idx][keep] > lo[rows, idx][keep], 1, -1)
+        tables.append(table)
+
+    if not tables:
+        return np.empty(0, dtype=EVENT_DTYPE)
+    events = np.concatenate(tables)
+    return events[np.lexsort((events['time'], events['scenario']))]
@@ -0,0 +1,129 @@
+import numpy as np
+
+from shoreline import slope_feasibility
+
+# ----------------------
+# Slope Grids
+# ----------------------
+# (low, high, step) of the pages' slope sliders
+SLIDER_AXES = {
+    'S_t': (0.001, 0.1, 0.001),
+    'S_f': (0.01, 1.0, 0.01),
+    'S_b': (0.001, 0.1, 0.001),
+}
+
+
+def slope_axis(low, high, step):
+    """Grid values low, low + step, ..., high, rounded so they equal the slider values."""
+    n = int(round((high - low) / step)) + 1
+    return np.round(low + step * np.arange(n), 12)
+
+# ----------------------
+# Feasibility Index
+# ----------------------
+class SlopeIndex:
+    """Feasible (S_t, S_f, S_b) triples of a discretized slope space, with their alpha+beta terms.
+
+    0 < S_t < S_b < S_f factorizes per basement slope: for S_b[k] the feasible topset
+    slopes are the run S_t[t_lo:t_hi[k]] of the sorted axis and the feasible foreset
+    slopes the tail S_f[f_lo[k]:], so the whole (n_t, n_f, n_b) mask is held as three
+    (n_b,) arrays. Triples are referred to by their axis indices (i_t, i_f, i_b).
+    """
+
+    def __init__(self, S_t, S_f, S_b):
+        self.S_t, self.S_f, self.S_b = (np.unique(np.asarray(a, dtype=float)) for a in (S_t, S_f, S_b))
+        self.t_lo = int(np.searchsorted(self.S_t, 0.0, side='right'))
+        self.t_hi = np.maximum(np.searchsorted(self.S_t, self.S_b, side='left'), self.t_lo)
+        self.f_lo = np.searchsorted(self.S_f, self.S_b, side='right')
+        self.counts = (self.t_hi - self.t_lo) * (self.S_f.size - self.f_lo)
+        self._offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        self._terms = None
+
+    @classmethod
+    def from_sliders(cls):
+        """Index over the slider domains and steps in SLIDER_AXES."""
+        return cls(*(slope_axis(*SLIDER_AXES[name]) for name in ('S_t', 'S_f', 'S_b')))
+
+    @property
+    def shape(self):
+        return self.S_t.size, self.S_f.size, self.S_b.size
+
+    @property
+    def n_feasible(self):
+        return int(self._offsets[-1])
+
+    def feasible(self, i_t, i_f, i_b):
+        """Element-wise feasibility of index triples, in O(1) each."""
+        i_t, i_f, i_b = np.broadcast_arrays(*(np.asarray(i, dtype=np.intp) for i in (i_t, i_f, i_b)))
+        return (i_t >= self.t_lo) & (i_t < self.t_hi[i_b]) & (i_f >= self.f_lo[i_b])
+
+    def mask(self):
+        """Dense (n_t, n_f, n_b) boolean mask of feasible triples."""
+        i_t = np.arange(self.S_t.size)[:, None, None]
+        i_f = np.arange(self.S_f.size)[None, :, None]
+        return (i_t >= self.t_lo) & (i_t < self.t_hi) & (i_f >= self.f_lo)
+
+    def locate(self, S_t, S_f, S_b):
+        """Axis indices (i_t, i_f, i_b) of slope values; raises ValueError for values off the grid."""
+        indices = []
+        for name, axis, values in (('S_t', self.S_t, S_t), ('S_f', self.S_f, S_f), ('S_b', self.S_b, S_b)):
+            values = np.asarray(values, dtype=float)
+            i = np.clip(np.searchsorted(axis, values), 1, axis.size - 1) if axis.size > 1 else np.zeros(values.shape, dtype=np.intp)
+            if axis.size > 1:
+                i = np.where(np.abs(axis[i - 1] - values) <= np.abs(axis[i] - values), i - 1, i)
+            if not np.all(np.isclose(axis[i], values, rtol=1e-9, atol=0)):
+                raise ValueError(f"{name} values are not on the index grid")
+            indices.append(i)
+        return tuple(indices)
+
+    def _alpha_beta_terms(self):
+        # S_b alpha (n_t, n_b) and S_b beta (n_f, n_b), so a denominator is one addition
+        if self._terms is None:
+            S_t, S_f, S_b = self.S_t[:, None], self.S_f[:, None], self.S_b
+            with np.errstate(invalid='ignore', divide='ignore'):
+                alpha = np.where(slope_feasibility(S_t, np.inf, S_b), S_b * S_t / (S_b - S_t), np.nan)
+                beta = np.where(S_f > S_b, S_b * S_f / (S_f - S_b), np.nan)
+            self._terms = alpha, beta
+        return self._terms
+
+    def denominator(self, i_t, i_f, i_b):
+        """S_b (alpha + beta) of index triples by table lookup; NaN where infeasible."""
+        alpha, beta = self._alpha_beta_terms()
+        return alpha[i_t, i_b] + beta[i_f, i_b]
+
+    def denominators(self):
+        """Dense (n_t, n_f, n_b) table of S_b (alpha + beta), NaN where infeasible."""
+        alpha, beta = self._alpha_beta_terms()
+        return alpha[:, None, :] + beta[None, :, :]
+
+    def triples(self, rank):
+        """Index arrays (i_t, i_f, i_b) of the feasible triples with the given numbers.
+
+        Feasible triples are numbered 0..n_feasible-1 by S_b, then S_f, then S_t, so a
+        sweep or sampler can address them directly without visiting infeasible ones.
+        """
+        rank = np.asarray(rank)
+        i_b = np.searchsorted(self._offsets, rank, side='right') - 1
+        offset = rank - self._offsets[i_b]
+        n_t = self.t_hi[i_b] - self.t_lo
+        return self.t_lo + offset % n_t, self.f_lo[i_b] + offset // n_t, i_b
+
+    def sample(self, rng, n):
+        """n slope triples (S_t, S_f, S_b) drawn uniformly from the feasible grid points.
+
+        Draws map straight onto feasible triples, so none is rejected however small the
+        feasible fraction of the grid.
+        """
+        if self.n_feasible == 0:
+            raise ValueError("The slope grid has no feasible triple")
+        i_t, i_f, i_b = self.triples(rng.integers(self.n_feasible, size=n))
+        return self.S_t[i_t], self.S_f[i_f], self.S_b[i_b]
+
+    def distribution(self):
+        """Joint distribution (rng, n) -> (S_t, S_f, S_b) for ensemble.draw, keyed by ('S_t', 'S_f', 'S_b')."""
+        return self.sample
+
+
+def around_slopes(S_t, S_f, S_b, spread, n=101):
+    """SlopeIndex over an n-point grid of +/- spread (as a fraction) around each slope."""
+    return SlopeIndex(*(np.linspace(value * (1 - spread), value * (1 + spread), n) for value in (S_t, S_f, S_b)))
@@ -0,0 +1,87 @@
+import json
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from results import ResultCache
+from trajectory import shared_range
+
+# ----------------------
+# Figure Cache
+# ----------------------
+# Building a go.Figure validates every property and dominates a rerun's cost, while the
+# figures only change with their data and display options. Finished figures are kept as
+# JSON, keyed by the result keys of the scenarios they show plus the options (plot mode,
+# colour scheme), and re-emitted without property validation. Figures are cached per
+# scenario: shared axis ranges are layout updates applied on emit and combined figures
+# overlay per-scenario layers, so changing one scenario never rebuilds the other's figures.
+MAX_FIGURE_ENTRIES = 256
+MAX_FIGURE_BYTES = 64 * 2**20
+
+FIGURES = ResultCache(max_entries=MAX_FIGURE_ENTRIES, ttl=None, max_bytes=MAX_FIGURE_BYTES)
+
+
+def cached_figure_dicts(trajectories, options, build, cache=FIGURES):
+    """Figures from build() for cached scenario trajectories as fresh dicts, serialized once.
+
+    options must hold everything else the figures depend on (hashable); trajectories
+    without a result key are always built afresh.
+    """
+    keys = tuple(trajectory.key for trajectory in trajectories)
+    if None in keys:
+        return [fig.to_dict() for fig in build()]
+    payloads = cache.get_or_compute((keys, options), lambda: tuple(pio.to_json(fig, validate=False) for fig in build()))
+    return [json.loads(payload) for payload in payloads]
+
+
+def _merge(base, update):
+    for name, value in update.items():
+        if isinstance(value, dict) and isinstance(base.get(name), dict):
+            _merge(base[name], value)
+        else:
+            base[name] = value
+    return base
+
+
+def emit_figures(dicts, layouts=None):
+    """go.Figure objects from figure dicts, with optional per-figure layout updates merged in.
+
+    The dicts come from validated figures, so they are wrapped with validation off.
+    """
+    layouts = layouts or [{}] * len(dicts)
+    return [go.Figure(_merge(d, {'layout': layout}), _validate=False) for d, layout in zip(dicts, layouts)]
+
+
+def cached_figures(trajectories, options, build, layouts=None, cache=FIGURES):
+    """emit_figures of cached_figure_dicts: ready-to-show figures, built once per key."""
+    return emit_figures(cached_figure_dicts(trajectories, options, build, cache), layouts)
+
+
+def overlay_figures(*layers):
+    """Overlays per-scenario figure sets: figure k holds the traces of every set's figure k
+    (in order) under the layout of the first set's figure k."""
+    return [{'data': [trace for figure in figures for trace in figure['data']], 'layout': figures[0]['layout']}
+            for figures in zip(*layers)]
+
+
+def shared_axis_layouts(trajectories, t_max):
+    """Layout updates giving the pages' three figures (eta vs t, X vs t, eta vs X) common ranges.
+
+    The ranges come from each trajectory's memoized extrema (widened by its envelope), so
+    they are recomputed for free when only one scenario changed.
+    """
+    eta_range = [value * 1.1 for value in shared_range(trajectories, 'eta')]
+    X_min, X_max = shared_range(trajectories, 'X')
+    X_range = [min(X_min, 0), X_max * 1.1]
+    t_range = [0, t_max]
+    return [
+        {'xaxis': {'range': t_range}, 'yaxis': {'range': eta_range}},
+        {'xaxis': {'range': t_range}, 'yaxis': {'range': X_range}},
+        {'xaxis': {'range': X_range}, 'yaxis': {'range': eta_range}},
+    ]
+
+
+def add_envelope(fig, t, band, color, name="P5–P95"):
+    """Adds a shaded band between the lower and upper quantile curves."""
+    fig.add_trace(go.Scatter(x=t, y=band[1], mode='lines', line=dict(width=0, color=color), showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=t, y=band[0], mode='lines', line=dict(width=0, color=color), fill='tonexty', fillcolor=color, opacity=0.25, name=name))
@@ -0,0 +1,317 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# ----------------------
+# Evaluation Cache
+# ----------------------
+# Every component's output is memoized under (component key, grid key), where the component
+# key holds its class and parameter values and the grid key is a digest of the time axis.
+# Components are cheap value objects, so the pages can rebuild them on every rerun and still
+# hit the cache; changing one component of a Sum only recomputes that component.
+MAX_CACHE_ENTRIES = 256
+MAX_CACHE_BYTES = 256 * 2**20
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+
+def grid_key(t):
+    """Digest identifying a time axis by its exact values."""
+    t = np.ascontiguousarray(t, dtype=float)
+    return t.shape, hashlib.blake2b(t.tobytes(), digest_size=16).digest()
+
+
+def cache_info():
+    """Hit/miss counters, memoized bytes and the number of memoized arrays."""
+    with _cache_lock:
+        return {**_stats, 'entries': len(_cache)}
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, bytes=0)
+
+
+def _param_key(value):
+    """Hashable form of a scalar or array parameter."""
+    value = np.asarray(value, dtype=float)
+    return value.item() if value.ndim == 0 else (value.shape, value.tobytes())
+
+
+def _column(value):
+    """Scalars stay scalars (a (T,) result); (N,) arrays become (N, 1) columns (an (N, T) result)."""
+    value = np.asarray(value, dtype=float)
+    return value.reshape(-1, 1) if value.ndim else value
+
+# ----------------------
+# Forcing Components
+# ----------------------
+class Forcing:
+    """A sea-level component eta(t), evaluated lazily and memoized per time axis.
+
+    Calling a component on t returns a read-only (T,) array, or (N, T) when any parameter
+    is an (N,) array of scenarios. Components add up with + into a Sum.
+    """
+
+    def key(self):
+        """Hashable identity of the component: its class and parameter values."""
+        return (type(self).__name__,) + tuple(_param_key(v) for v in self._params)
+
+    def _evaluate(self, t, grid):
+        raise NotImplementedError
+
+    def evaluate(self, t, grid=None, memoize=True):
+        """Memoized evaluation on t; grid is a precomputed grid_key(t).
+
+        memoize=False bypasses the cache, e.g. for one-off chunks of a streamed run.
+        """
+        t = np.asarray(t, dtype=float)
+        if not memoize:
+            return self._evaluate(t, None)
+        key = (self.key(), grid or grid_key(t))
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                _stats['hits'] += 1
+                return _cache[key]
+            _stats['misses'] += 1
+        eta = self._evaluate(t, key[1])
+        eta.setflags(write=False)
+        with _cache_lock:
+            if key not in _cache:
+                _cache[key] = eta
+                _stats['bytes'] += eta.nbytes
+            while _cache and (len(_cache) > MAX_CACHE_ENTRIES or _stats['bytes'] > MAX_CACHE_BYTES):
+                _stats['bytes'] -= _cache.popitem(last=False)[1].nbytes
+        return eta
+
+    def __call__(self, t):
+        return self.evaluate(t)
+
+    def __add__(self, other):
+        return Sum(self, other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}{tuple(self._params)}"
+
+
+class Linear(Forcing):
+    """Initial depth plus a constant rate: Z0 + Zdot * t."""
+
+    def __init__(self, Z0, Zdot):
+        self._params = (Z0, Zdot)
+
+    def _evaluate(self, t, grid):
+        Z0, Zdot = map(_column, self._params)
+        return np.broadcast_to(Z0 + Zdot * t, np.broadcast_shapes(Z0.shape, Zdot.shape, t.shape)).copy()
+
+
+class Sinusoid(Forcing):
+    """A * sin(2 pi t / P + phase); a period of 0 disables it, matching the pages' checkboxes."""
+
+    def __init__(self, A, P, phase=0.0):
+        self._params = (A, P, phase)
+
+    def _evaluate(self, t, grid):
+        A, P, phase = map(_column, self._params)
+        eta = np.zeros(np.broadcast_shapes(A.shape, P.shape, phase.shape, t.shape))
+        on = np.broadcast_to((P > 0) & (A != 0), eta.shape[:-1] + (1,))
+        if np.any(on):
+            omega = 2 * np.pi / np.where(P > 0, P, 1.0)
+            np.sin(omega * t + phase, out=eta, where=on)
+            np.multiply(eta, A, out=eta, where=on)
+        return eta
+
+
+class Piecewise(Forcing):
+    """Piecewise-constant rate of change: rates[k] applies on [breaks[k], breaks[k + 1]).
+
+    breaks starts the first segment and the last rate continues past the final break;
+    the level is continuous and equals Z0 at breaks[0] (and before it).
+    """
+
+    def __init__(self, breaks, rates, Z0=0.0):
+        breaks = np.asarray(breaks, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+        if breaks.ndim != 1 or breaks.shape != rates.shape or np.any(np.diff(breaks) <= 0):
+            raise ValueError("breaks must be increasing and match rates in length")
+        self._params = (breaks, rates, Z0)
+
+    def _evaluate(self, t, grid):
+        breaks, rates, Z0 = self._params
+        # Level at each break, then linear from the break to the left of each sample
+        levels = np.concatenate([[0.0], np.cumsum(rates[:-1] * np.diff(breaks))])
+        k = np.clip(np.searchsorted(breaks, t, side='right') - 1, 0, None)
+        rise = np.where(t > breaks[0], levels[k] + rates[k] * (t - breaks[k]), 0.0)
+        return np.broadcast_to(_column(Z0) + rise, np.broadcast_shapes(np.shape(_column(Z0)), t.shape)).copy()
+
+
+class Tabulated(Forcing):
+    """A sea-level record (times, levels) linearly interpolated onto the model time axis.
+
+    levels is (K,) or (N, K) for one record per scenario; outside the record the first
+    and last values are held.
+    """
+
+    def __init__(self, times, levels):
+        times = np.asarray(times, dtype=float)
+        levels = np.asarray(levels, dtype=float)
+        if times.ndim != 1 or levels.shape[-1:] != times.shape or np.any(np.diff(times) <= 0):
+            raise ValueError("times must be increasing and match the last axis of levels")
+        self._params = (times, levels)
+
+    def _evaluate(self, t, grid):
+        times, levels = self._params
+        if levels.ndim == 1:
+            return np.interp(t, times, levels)
+        # One searchsorted shared by every record
+        k = np.clip(np.searchsorted(times, t, side='right') - 1, 0, times.size - 2)
+        w = np.clip((t - times[k]) / (times[k + 1] - times[k]), 0.0, 1.0)
+        return levels[:, k] * (1 - w) + levels[:, k + 1] * w
+
+
+class Spectral(Forcing):
+    """Many-harmonic forcing sum_k A_k sin(2 pi t / P_k + phase_k), e.g. an orbital-style spectrum.
+
+    amplitudes and phases are (K,) or (N, K) tables (one spectrum per ensemble member);
+    periods is (K,), shared by all members. Harmonics with a period <= 0 are dropped.
+    method picks the synthesis (see synthesize): 'auto', 'fft', 'recurrence' or 'direct'.
+    """
+
+    def __init__(self, amplitudes, periods, phases=0.0, method='auto'):
+        if method not in SYNTHESIS_METHODS:
+            raise ValueError(f"Unknown synthesis method '{method}', expected one of {SYNTHESIS_METHODS}")
+        periods = np.asarray(periods, dtype=float)
+        if periods.ndim != 1:
+            raise ValueError("periods must be a (K,) table shared by all members")
+        self._params = (amplitudes, periods, phases)
+        self.method = method
+
+    def key(self):
+        return super().key() + (self.method,)
+
+    def _evaluate(self, t, grid):
+        return synthesize(t, *self._params, method=self.method)
+
+
+class Sum(Forcing):
+    """Sum of components; each term is memoized on its own, so editing one recomputes only it."""
+
+    def __init__(self, *components):
+        self.components = tuple(c for part in components for c in (part.components if isinstance(part, Sum) else (part,)))
+
+    def key(self):
+        return ('Sum',) + tuple(c.key() for c in self.components)
+
+    def _evaluate(self, t, grid):
+        terms = [c.evaluate(t, grid, memoize=grid is not None) for c in self.components]
+        eta = np.zeros(np.broadcast_shapes(t.shape, *(term.shape for term in terms)))
+        for term in terms:
+            eta += term
+        return eta
+
+    def __repr__(self):
+        return ' + '.join(map(repr, self.components))
+
+
+# ----------------------
+# Spectral Synthesis
+# ----------------------
+SYNTHESIS_METHODS = ('auto', 'fft', 'recurrence', 'direct')
+
+
+def _uniform_step(t):
+    """Step of an evenly spaced time axis, or None."""
+    if t.ndim != 1 or t.size < 2:
+        return None
+    dt = (t[-1] - t[0]) / (t.size - 1)
+    if dt <= 0 or np.abs(np.diff(t) - dt).max() > 1e-9 * dt:
+        return None
+    return dt
+
+
+def _fft_bins(omega, dt, n):
+    """DFT bin of every harmonic when all of them fall exactly on the n-point grid's bins, else None."""
+    bins = omega * dt * n / (2 * np.pi)
+    k = np.rint(bins)
+    if np.all(np.abs(bins - k) <= 1e-9 * np.maximum(bins, 1)) and np.all((k > 0) & (k < n / 2)):
+        return k.astype(np.int64)
+    return None
+
+
+def _synthesize_fft(t, A, bins, theta):
+    """One inverse real FFT: each harmonic is a single spectral line of the n-point record."""
+    n = t.size
+    spectrum = np.zeros(A.shape[:-1] + (n // 2 + 1,), dtype=complex)
+    # A sin(theta + 2 pi k m / n) = Re(-i A e^{i theta} e^{2 pi i k m / n}); irfft scales by 2 / n
+    lines = -0.5j * n * A * np.exp(1j * theta)
+    np.add.at(spectrum.reshape(-1, spectrum.shape[-1]), (slice(None), bins), lines.reshape(-1, bins.size))
+    return np.fft.irfft(spectrum, n=n)
+
+
+def _synthesize_recurrence(t, A, omega, theta, dt):
+    """Blocked angle-addition recurrence: sin(w (t0 + (bB + m) dt) + phi) via one complex matmul.
+
+    With T = nb * B samples, eta[b, m] = Im(sum_k C[b, k] W[k, m]) where C = A e^{i (w (t0 + b B dt) + phi)}
+    and W = e^{i w m dt}; only (nb + B) K exponentials are evaluated and the 2 K T multiply-adds
+    run in BLAS.
+    """
+    n = t.size
+    B = max(int(np.sqrt(n)), 1)
+    nb = -(-n // B)
+    W = np.exp(1j * omega[:, None] * (dt * np.arange(B)))
+    C = A[..., None, :] * np.exp(1j * (theta[..., None, :] + omega * (dt * B * np.arange(nb))[:, None]))
+    # Only the imaginary part is needed: two real products instead of one complex one
+    C = C.reshape(-1, omega.size)
+    eta = np.ascontiguousarray(C.real) @ W.imag + np.ascontiguousarray(C.imag) @ W.real
+    return eta.reshape(A.shape[:-1] + (nb * B,))[..., :n]
+
+
+def _synthesize_direct(t, A, omega, theta, chunk=4096):
+    """Plain sum of sines for non-uniform axes, chunked over time to bound the (T, K) temporaries."""
+    eta = np.empty(A.shape[:-1] + t.shape)
+    for lo in range(0, t.size, chunk):
+        tc = t[lo:lo + chunk]
+        eta[..., lo:lo + chunk] = np.einsum('...tk,...k->...t', np.sin(tc[:, None] * omega + theta[..., None, :]), A)
+    return eta
+
+
+def synthesize(t, amplitudes, periods, phases=0.0, method='auto'):
+    """Sum of K harmonics A_k sin(2 pi t / P_k + phase_k) on the time axis t.
+
+    amplitudes and phases are (K,) or (N, K) and periods (K,); returns (T,) or (N, T).
+    'fft' is a single inverse real FFT and needs an evenly spaced axis on whose DFT bins
+    every period falls (P_k = T dt / integer); 'recurrence' works on any evenly spaced
+    axis and replaces the K T sines by a blocked complex matrix product; 'direct' sums
+    the sines and works anywhere. 'auto' takes the first that applies.
+    """
+    t = np.asarray(t, dtype=float)
+    periods = np.asarray(periods, dtype=float)
+    A, theta = np.broadcast_arrays(np.asarray(amplitudes, dtype=float), np.asarray(phases, dtype=float))
+    A, theta = (np.broadcast_to(x, x.shape[:-1] + periods.shape) if x.ndim else np.broadcast_to(x, periods.shape) for x in (A, theta))
+    on = periods > 0
+    A, theta, omega = A[..., on], theta[..., on], 2 * np.pi / periods[on]
+    if omega.size == 0:
+        return np.zeros(A.shape[:-1] + t.shape)
+
+    dt = _uniform_step(t)
+    bins = _fft_bins(omega, dt, t.size) if dt is not None else None
+    if method in ('auto', 'fft') and bins is not None:
+        return _synthesize_fft(t, A, bins, theta + omega * t[0])
+    if method == 'fft':
+        raise ValueError("FFT synthesis needs an evenly spaced axis with every period on a DFT bin (P = T dt / k)")
+    if method in ('auto', 'recurrence') and dt is not None:
+        return _synthesize_recurrence(t, A, omega, theta + omega * t[0], dt)
+    if method == 'recurrence':
+        raise ValueError("Recurrence synthesis needs an evenly spaced time axis")
+    return _synthesize_direct(t, A, omega, theta)
+
+
+def page_forcing(Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """The pages' sea level: Linear(Z0, Zdot) + Sinusoid(A1, P1) + Sinusoid(A2, P2), as sea_level_batch."""
+    return Sum(Linear(Z0, Zdot), Sinusoid(A1, P1), Sinusoid(A2, P2))
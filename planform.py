@@ -0,0 +1,104 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from shoreline import KernelWorkspace, shoreline_location_into, shoreline_location_advanced_into
+from sweep import check_model
+
+# ----------------------
+# Along-Strike Columns
+# ----------------------
+def lobe_shares(M, center=0.5, width=0.2):
+    """Gaussian supply shares of M along-strike columns (summing to 1), peaking at center.
+
+    center and width are fractions of the strike length, e.g. a lobe fed by one distributary.
+    """
+    y = (np.arange(M) + 0.5) / M
+    shares = np.exp(-0.5 * ((y - center) / width) ** 2)
+    return shares / shares.sum()
+
+
+def strike_gradient(M, value, change):
+    """Values varying linearly along strike from value * (1 - change) to value * (1 + change)."""
+    return value * (1 + change * np.linspace(-1, 1, M))
+
+
+def run_planform(model, t, sea_level, Qs, shares, Z0, S_b=0.05, S_t=0.01, S_f=0.1, dtype=np.float64, memory_budget=64 * 2**20):
+    """(M, T) shoreline map of M along-strike columns under one shared sea-level history.
+
+    Column m is the 1-D box model ('simple') or slope model ('advanced') with supply
+    Qs * shares[m], water depth eta_m(t) = Z0[m] + sea_level(t) and, for 'advanced', its
+    own basement slope S_b[m] (S_t, S_f may also vary per column). sea_level is the shared
+    change (a forcing, or a (T,) array) and t is (T,). Columns are evaluated in row blocks
+    of memory_budget bytes with the allocation-free kernels, so only the (M, T) output in
+    dtype (float32 halves it) scales with M x T. Returns (X, feasible), feasible being (M,).
+    """
+    check_model(model)
+    t = np.asarray(t, dtype=float)
+    sea_level = np.asarray(sea_level(t) if callable(sea_level) else sea_level, dtype=float)
+    if sea_level.shape != t.shape:
+        raise ValueError("The shared sea-level history must be a single (T,) curve")
+    supply, Z0, S_b, S_t, S_f = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float)) for p in (Qs * np.asarray(shares, dtype=float), Z0, S_b, S_t, S_f)))
+    M = supply.size
+
+    X = np.empty((M, t.size), dtype=dtype)
+    feasible = np.ones(M, dtype=bool)
+    # A workspace holds four (rows, T) buffers
+    rows = max(1, min(M, int(memory_budget // (4 * t.size * np.dtype(dtype).itemsize))))
+    workspace = None
+    for lo in range(0, M, rows):
+        hi = min(lo + rows, M)
+        if workspace is None or workspace.shape[0] != hi - lo:
+            workspace = KernelWorkspace((hi - lo, t.size), dtype)
+        eta = np.add(Z0[lo:hi, None], sea_level, out=workspace.eta)
+        if model == 'simple':
+            shoreline_location_into(supply[lo:hi], eta, t, workspace, out=X[lo:hi])
+        else:
+            _, feasible[lo:hi] = shoreline_location_advanced_into(supply[lo:hi], eta, t, S_t[lo:hi], S_f[lo:hi], S_b[lo:hi], workspace, out=X[lo:hi])
+    return X, feasible
+
+# ----------------------
+# Rendering
+# ----------------------
+def display_stride(n, limit):
+    """Smallest step that thins n samples down to at most limit for display."""
+    return max(1, -(-n // limit))
+
+
+def planform_heatmap(t, X, max_cells=(400, 600), title="Shoreline Map"):
+    """Heatmap of the (M, T) map: time across, strike position up, colour = shoreline position.
+
+    Large maps are strided down to at most max_cells (strike, time) cells for display.
+    """
+    ms, ts = display_stride(X.shape[0], max_cells[0]), display_stride(X.shape[1], max_cells[1])
+    strike = (np.arange(X.shape[0]) + 0.5) / X.shape[0]
+    fig = go.Figure(go.Heatmap(x=t[::ts], y=strike[::ms], z=np.asarray(X[::ms, ::ts], dtype=float), colorscale='Viridis', colorbar=dict(title="Shoreline")))
+    fig.update_layout(title=title, xaxis_title="Time (t)", yaxis_title="Along-strike position (fraction)", template="plotly_white")
+    return fig
+
+
+def planform_animation(t, X, n_frames=60, max_columns=2000, title="Planform Evolution"):
+    """Animated map view of the shoreline: one frame per sampled time, with a time slider."""
+    ms = display_stride(X.shape[0], max_columns)
+    strike = ((np.arange(X.shape[0]) + 0.5) / X.shape[0])[::ms]
+    frames_idx = np.unique(np.linspace(0, t.size - 1, min(n_frames, t.size)).astype(int))
+    lines = [np.asarray(X[::ms, k], dtype=float) for k in frames_idx]
+    finite = np.concatenate([v[np.isfinite(v)] for v in lines] + [np.zeros(1)])
+    x_range = [min(finite.min(), 0), finite.max() * 1.1 or 1.0]
+
+    def trace(x):
+        return go.Scatter(x=x, y=strike, mode='lines', fill='tozerox', line=dict(width=3, color='saddlebrown'), fillcolor='rgba(210, 180, 140, 0.6)', name="Delta plain")
+
+    labels = [f"{t[k]:.4g}" for k in frames_idx]
+    fig = go.Figure(data=[trace(lines[0])], frames=[go.Frame(data=[trace(x)], name=label) for x, label in zip(lines, labels)])
+    fig.update_layout(
+        title=title, xaxis_title="Shoreline position (seaward)", yaxis_title="Along-strike position (fraction)",
+        template="plotly_white", xaxis=dict(range=x_range), yaxis=dict(range=[0, 1]),
+        updatemenus=[dict(type='buttons', showactive=False, buttons=[
+            dict(label="▶ Play", method='animate', args=[None, dict(frame=dict(duration=80, redraw=False), fromcurrent=True)]),
+            dict(label="⏸ Pause", method='animate', args=[[None], dict(mode='immediate', frame=dict(duration=0, redraw=False))]),
+        ])],
+        sliders=[dict(currentvalue=dict(prefix="t = "), steps=[
+            dict(label=label, method='animate', args=[[label], dict(mode='immediate', frame=dict(duration=0, redraw=False))]) for label in labels
+        ])],
+    )
+    return fig
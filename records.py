@@ -0,0 +1,204 @@
+import hashlib
+import itertools
+import os
+import tempfile
+
+import numpy as np
+
+from forcing import Forcing
+
+try:
+    import netCDF4
+except ImportError:  # netCDF4 is optional; only needed for .nc records
+    netCDF4 = None
+
+# ----------------------
+# Record Files
+# ----------------------
+# External sea-level reconstructions (CSV, NetCDF or .npy) are converted once, chunk by chunk,
+# into a canonical binary file of float64 (time, level) rows sorted by time. The binary file is
+# named after the source file's content digest, so a repeat load (in any process) memory-maps it
+# instead of re-parsing, and files larger than RAM never have to be held in memory.
+CHUNK_ROWS = 1 << 20
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'delta-shoreline-records')
+
+_digests = {}
+
+
+def file_digest(path, chunk_size=1 << 24):
+    """Content digest of a file, streamed in chunks and memoized by (path, size, mtime)."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _digests:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                h.update(block)
+        _digests[key] = h.hexdigest()
+    return _digests[key]
+
+
+def _csv_chunks(path, time_column, level_column, chunk_rows, delimiter):
+    with open(path) as f:
+        lines = (line for line in f if line.strip() and not line.lstrip().startswith('#'))
+        first = next(lines, None)
+        if first is None:
+            return
+        cells = [c.strip() for c in first.split(delimiter)]
+        try:
+            [float(c) for c in cells]
+            lines = itertools.chain([first], lines)
+        except ValueError:
+            # Header row: resolve column names
+            time_column = cells.index(time_column) if isinstance(time_column, str) else time_column
+            level_column = cells.index(level_column) if isinstance(level_column, str) else level_column
+        if isinstance(time_column, str) or isinstance(level_column, str):
+            raise ValueError("Column names given but the CSV file has no header row")
+        while True:
+            block = list(itertools.islice(lines, chunk_rows))
+            if not block:
+                return
+            yield np.loadtxt(block, delimiter=delimiter, usecols=(time_column, level_column), ndmin=2)
+
+
+def _netcdf_chunks(path, time_variable, level_variable, chunk_rows):
+    if netCDF4 is None:
+        raise ImportError("Reading NetCDF records requires the netCDF4 package")
+    with netCDF4.Dataset(path) as ds:
+        time, level = ds.variables[time_variable], ds.variables[level_variable]
+        if time.ndim != 1 or level.shape != time.shape:
+            raise ValueError(f"'{time_variable}' and '{level_variable}' must be 1-d variables of equal length")
+        for lo in range(0, time.shape[0], chunk_rows):
+            yield np.column_stack([np.ma.filled(time[lo:lo + chunk_rows], np.nan), np.ma.filled(level[lo:lo + chunk_rows], np.nan)])
+
+
+def _npy_chunks(path, chunk_rows):
+    data = np.load(path, mmap_mode='r')
+    if data.ndim != 2 or data.shape[1] != 2:
+        raise ValueError("A .npy record must be an (n, 2) array of (time, level) rows")
+    for lo in range(0, data.shape[0], chunk_rows):
+        yield np.asarray(data[lo:lo + chunk_rows], dtype=float)
+
+
+def convert_record(path, time_column=0, level_column=1, delimiter=',', cache_dir=None, chunk_rows=CHUNK_ROWS):
+    """Streams a sea-level record into the canonical binary cache; returns the binary file's path.
+
+    path is a .csv/.txt (time_column and level_column are indices or header names), a .nc
+    (they are variable names, 'time' and 'sea_level' by default) or an (n, 2) .npy file.
+    Rows with missing values are dropped. Times must be strictly monotonic; records given
+    as ages (decreasing time) are stored in increasing order. Conversion is skipped when
+    the binary for this file content already exists.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.nc':
+        time_column = 'time' if time_column == 0 else time_column
+        level_column = 'sea_level' if level_column == 1 else level_column
+    name = f"{file_digest(path)}-{hashlib.blake2b(repr((time_column, level_column)).encode(), digest_size=4).hexdigest()}.f8"
+    target = os.path.join(cache_dir, name)
+    if os.path.exists(target):
+        return target
+
+    if ext == '.nc':
+        chunks = _netcdf_chunks(path, time_column, level_column, chunk_rows)
+    elif ext == '.npy':
+        chunks = _npy_chunks(path, chunk_rows)
+    elif ext in ('.csv', '.txt'):
+        chunks = _csv_chunks(path, time_column, level_column, chunk_rows, delimiter)
+    else:
+        raise ValueError(f"Unsupported record format '{ext}', expected .csv, .txt, .nc or .npy")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    partial = f"{target}.{os.getpid()}.partial"
+    direction, last, n_rows = 0, None, 0
+    try:
+        with open(partial, 'wb') as out:
+            for chunk in chunks:
+                chunk = chunk[np.isfinite(chunk).all(axis=1)]
+                if not chunk.size:
+                    continue
+                times = chunk[:, 0] if last is None else np.concatenate([[last], chunk[:, 0]])
+                step = np.diff(times)
+                if step.size and not direction:
+                    direction = int(np.sign(step[0]))
+                if step.size and not (np.all(step > 0) if direction > 0 else np.all(step < 0)):
+                    raise ValueError(f"Record times in '{path}' must be strictly increasing or decreasing")
+                last = chunk[-1, 0]
+                n_rows += chunk.shape[0]
+                np.ascontiguousarray(chunk, dtype='<f8').tofile(out)
+        if n_rows < 2:
+            raise ValueError(f"Record '{path}' needs at least two valid rows")
+        if direction < 0:
+            _reverse_rows(partial, n_rows, chunk_rows)
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return target
+
+
+def _reverse_rows(path, n_rows, chunk_rows):
+    """Reverses the row order of a binary record in place, swapping chunks from both ends."""
+    data = np.memmap(path, dtype='<f8', mode='r+', shape=(n_rows, 2))
+    for lo in range(0, n_rows // 2, chunk_rows):
+        hi = min(lo + chunk_rows, n_rows // 2)
+        head = data[lo:hi].copy()
+        data[lo:hi] = data[n_rows - hi:n_rows - lo][::-1]
+        data[n_rows - hi:n_rows - lo] = head[::-1]
+    data.flush()
+
+
+def load_record(path, time_column=0, level_column=1, delimiter=',', cache_dir=None):
+    """Memory-mapped (times, levels) views of a record, converting it on first use."""
+    binary = convert_record(path, time_column, level_column, delimiter, cache_dir)
+    data = np.memmap(binary, dtype='<f8', mode='r').reshape(-1, 2)
+    return data[:, 0], data[:, 1]
+
+# ----------------------
+# Interpolation
+# ----------------------
+def interpolate_record(times, levels, t, chunk=CHUNK_ROWS):
+    """Linear interpolation of a (possibly memory-mapped) record onto t, holding the end values.
+
+    Each chunk of t is located with one vectorized searchsorted over the sorted record,
+    which touches only O(log n) pages per sample, so only the bracketing rows are read.
+    """
+    t = np.asarray(t, dtype=float)
+    flat = t.reshape(-1)
+    eta = np.empty(flat.shape)
+    n = times.shape[0]
+    for lo in range(0, flat.size, chunk):
+        tc = flat[lo:lo + chunk]
+        k = np.clip(np.searchsorted(times, tc, side='right') - 1, 0, n - 2)
+        t0, t1 = np.asarray(times[k]), np.asarray(times[k + 1])
+        w = np.clip((tc - t0) / (t1 - t0), 0.0, 1.0)
+        eta[lo:lo + chunk] = np.asarray(levels[k]) * (1 - w) + np.asarray(levels[k + 1]) * w
+    return eta.reshape(t.shape)
+
+
+class Record(Forcing):
+    """Sea level from an external reconstruction file, resampled onto the model time axis.
+
+    t_model = (t_record - time_origin) * time_scale and eta = level * level_scale, e.g.
+    time_scale=1000 for a record in ka; a negative time_scale maps ages (time before
+    present, with time_origin the age at t = 0) onto model time. Combine with other
+    components (e.g. a Linear subsidence term) via +. Results are memoized by
+    (file digest, columns, scales, grid).
+    """
+
+    def __init__(self, path, time_column=0, level_column=1, time_origin=0.0, time_scale=1.0, level_scale=1.0, delimiter=',', cache_dir=None):
+        self.path = path
+        self.columns = (time_column, level_column, delimiter)
+        self.cache_dir = cache_dir
+        self._params = (time_origin, time_scale, level_scale)
+
+    def key(self):
+        return super().key() + (file_digest(self.path), self.columns)
+
+    def _evaluate(self, t, grid):
+        time_origin, time_scale, level_scale = self._params
+        times, levels = load_record(self.path, *self.columns, cache_dir=self.cache_dir)
+        return level_scale * interpolate_record(times, levels, t / time_scale + time_origin)
+
+    def __repr__(self):
+        return f"Record({self.path!r})"
@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from ensemble import envelope
+from forcing import page_forcing
+from shoreline import shoreline_location, shoreline_location_advanced, slope_feasibility
+from store import STORE, result_key
+from timegrid import adaptive_time_grid
+from trajectory import Trajectory, advanced_trajectory, simple_trajectory
+
+# ----------------------
+# Result Cache
+# ----------------------
+# Whole scenario results (time grid, forcing, shoreline and envelope) are memoized per
+# process under a digest of their canonical parameters (store.result_key). Streamlit serves
+# every session from threads of one process, so the cache is shared by all of them: the
+# cached arrays are made read-only, and concurrent requests for the same missing key wait
+# for a single computation. Misses fall through to the on-disk store shared by all processes.
+MAX_RESULT_ENTRIES = 512
+RESULT_TTL = 3600.0
+MAX_RESULT_BYTES = 256 * 2**20
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, Trajectory):
+        return sum(_nbytes(a) for a in (value.t, value.eta, value.X, value.band))
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _freeze(value):
+    """Marks every array reachable from a result read-only, since all sessions share it."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, Trajectory):
+        for array in (value.t, value.eta, value.X, value.band):
+            _freeze(array)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU of computed results, bounded by entries, age (seconds) and bytes.
+
+    Entries older than ttl are dropped when touched and on every insertion; a ttl of None
+    keeps entries until they are evicted by the entry or byte limits.
+    """
+
+    def __init__(self, max_entries=MAX_RESULT_ENTRIES, ttl=RESULT_TTL, max_bytes=MAX_RESULT_BYTES):
+        if max_entries < 1 or max_bytes <= 0 or (ttl is not None and ttl <= 0):
+            raise ValueError("max_entries, ttl and max_bytes must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes, expires)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+    def info(self):
+        """Hit/miss/eviction counters, held bytes and the number of entries."""
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.update(hits=0, misses=0, evictions=0, bytes=0)
+
+    def _drop(self, key):
+        self._stats['bytes'] -= self._entries.pop(key)[1]
+        self._stats['evictions'] += 1
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] < now:
+            self._drop(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, calling compute() once on a miss; concurrent misses share it."""
+        while True:
+            with self._lock:
+                entry = self._lookup(key, time.monotonic())
+                if entry is not None:
+                    self._stats['hits'] += 1
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._stats['misses'] += 1
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Another session is computing this key; use its result (or retry if it failed)
+            pending.wait()
+
+        try:
+            value = _freeze(compute())
+            self._store(key, value)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+        return value
+
+    def _store(self, key, value):
+        nbytes = _nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        now = time.monotonic()
+        expires = np.inf if self.ttl is None else now + self.ttl
+        with self._lock:
+            for stale in [k for k, entry in self._entries.items() if entry[2] < now]:
+                self._drop(stale)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, nbytes, expires)
+            self._stats['bytes'] += nbytes
+            while len(self._entries) > self.max_entries or self._stats['bytes'] > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+
+RESULTS = ResultCache()
+
+# ----------------------
+# Page Scenarios
+# ----------------------
+def _forcing_params(Z0, Zdot, A1, P1, A2, P2):
+    # A sinusoid of zero amplitude contributes nothing, whatever its period
+    return dict(Z0=Z0, Zdot=Zdot, A1=A1, P1=P1 if A1 else 0.0, A2=A2, P2=P2 if A2 else 0.0)
+
+
+def _time_grid(tmax, forcing, shoreline, adaptive, n_points, singular=False):
+    return adaptive_time_grid(tmax, shoreline, forcing, n_points, singular=singular) if adaptive else np.linspace(0, tmax, n_points)
+
+
+def _stored_trajectory(key, compute, store):
+    """Trajectory for key from the on-disk store, or computed by compute() and stored.
+
+    The store holds t, eta, X, the band quantiles and the summary metrics, so a warm hit
+    memory-maps the arrays and needs no summary pass either.
+    """
+    def arrays():
+        trajectory = compute()
+        stored = {'t': trajectory.t, 'eta': trajectory.eta, 'X': trajectory.X}
+        for name, quantiles in (trajectory.band or {}).items():
+            stored.update({f'band_{name}_{k}': q for k, q in enumerate(quantiles)})
+        summary = dict(trajectory.summary, turning_points=trajectory.summary['turning_points'].tolist())
+        return stored, summary
+
+    if store is None:
+        return compute()
+    stored, summary = store.get_or_compute(key, arrays)
+    band = {}
+    # Quantile k of a series is stored as band_<series>_<k>; order by k numerically
+    names = [name.split('_') for name in stored if name.startswith('band_')]
+    for _, series, k in sorted(names, key=lambda name: (name[1], int(name[2]))):
+        band[series] = band.get(series, ()) + (stored[f'band_{series}_{k}'],)
+    summary = dict(summary, turning_points=np.asarray(summary['turning_points'], dtype=np.int64))
+    return Trajectory(stored['t'], stored['eta'], stored['X'], band or None, summary, key)
+
+
+def simple_scenario(Qs, tmax, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0, adaptive=True, n_members=0, spread=0.0, n_points=500, cache=RESULTS, store=STORE):
+    """One scenario of the simple page as a Trajectory, memoized in cache and store.
+
+    The time grid is adaptive (or uniform) with n_points samples; with n_members > 0 the
+    band holds the P5-P95 envelope of a +/- spread (fraction) ensemble. Pass store=None
+    to skip the on-disk store.
+    """
+    params = dict(Qs=Qs, **_forcing_params(Z0, Zdot, A1, P1, A2, P2))
+    if not n_members:
+        spread = 0.0
+
+    def compute():
+        forcing = page_forcing(*(params[name] for name in ('Z0', 'Zdot', 'A1', 'P1', 'A2', 'P2')))
+        t = _time_grid(tmax, forcing, lambda t: shoreline_location(Qs, forcing, t), adaptive, n_points, singular=True)
+        band = envelope('simple', params, t, n_members, spread) if n_members else None
+        return simple_trajectory(Qs, forcing, t, band, key=key)
+
+    key = result_key('simple', tmax=tmax, adaptive=adaptive, n_members=n_members, spread=spread, n_points=n_points, **params)
+    return cache.get_or_compute(key, lambda: _stored_trajectory(key, compute, store))
+
+
+def advanced_scenario(q_s, tmax, S_t, S_f, S_b, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0, adaptive=True, n_members=0, spread=0.0, n_points=500, cache=RESULTS, store=STORE):
+    """One scenario of the advanced page as a Trajectory (shoreline s), memoized in cache and store.
+
+    As simple_scenario; infeasible slopes give an all-NaN shoreline and no envelope.
+    """
+    params = dict(q_s=q_s, S_t=S_t, S_f=S_f, S_b=S_b, **_forcing_params(Z0, Zdot, A1, P1, A2, P2))
+    if not (n_members and slope_feasibility(S_t, S_f, S_b)):
+        n_members, spread = 0, 0.0
+
+    def compute():
+        forcing = page_forcing(*(params[name] for name in ('Z0', 'Zdot', 'A1', 'P1', 'A2', 'P2')))
+        t = _time_grid(tmax, forcing, lambda t: shoreline_location_advanced(q_s, forcing, t, S_t, S_f, S_b), adaptive, n_points)
+        band = envelope('advanced', params, t, n_members, spread) if n_members else None
+        return advanced_trajectory(q_s, forcing, t, S_t, S_f, S_b, band, key=key)
+
+    key = result_key('advanced', tmax=tmax, adaptive=adaptive, n_members=n_members, spread=spread, n_points=n_points, **params)
+    return cache.get_or_compute(key, lambda: _stored_trajectory(key, compute, store))
@@ -0,0 +1,167 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sweep import check_model
+
+# ----------------------
+# Model Evaluation
+# ----------------------
+def _check(model, bounds, fixed):
+    run, defaults = check_model(model, set(bounds) | set(fixed or {}))
+    return run, {**defaults, **(fixed or {})}
+
+
+def _scale(unit, bounds):
+    """Maps samples from the unit hypercube onto the parameter bounds."""
+    lo = np.array([b[0] for b in bounds.values()], dtype=float)
+    hi = np.array([b[1] for b in bounds.values()], dtype=float)
+    return lo + unit * (hi - lo)
+
+
+def _evaluate(run, params, names, samples, t):
+    """Shoreline trajectories (n, T) for n sample rows; columns of samples follow names."""
+    result = run(t, **{**params, **{name: samples[:, j] for j, name in enumerate(names)}})
+    shoreline = result[1]
+    return np.broadcast_to(shoreline, (samples.shape[0], t.size))
+
+# ----------------------
+# Sobol Indices (Saltelli sampling)
+# ----------------------
+def _sobol_sums(run, params, names, A, B, t):
+    """Partial sums of the Saltelli (first-order) and Jansen (total) estimators for one chunk.
+
+    Rows with a non-finite output (infeasible slope triples) are dropped from every sum.
+    """
+    D = len(names)
+    fA = _evaluate(run, params, names, A, t)
+    fB = _evaluate(run, params, names, B, t)
+    ok = np.isfinite(fA).all(axis=1) & np.isfinite(fB).all(axis=1)
+    first = np.zeros((D, t.size))
+    total = np.zeros((D, t.size))
+    counts = np.zeros(D)
+    for i in range(D):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        fAB = _evaluate(run, params, names, AB, t)
+        rows = ok & np.isfinite(fAB).all(axis=1)
+        diff = fAB[rows] - fA[rows]
+        first[i] = (fB[rows] * diff).sum(axis=0)
+        total[i] = (diff ** 2).sum(axis=0)
+        counts[i] = rows.sum()
+    both = np.concatenate([fA[ok], fB[ok]])
+    return first, total, counts, both.shape[0], both.sum(axis=0), (both ** 2).sum(axis=0)
+
+
+def sobol_indices(model, bounds, t, n_samples, fixed=None, chunk_size=2000, workers=None, seed=None):
+    """Time-resolved first-order (S1) and total (ST) Sobol indices of the shoreline position.
+
+    bounds maps parameter names (keyword names of run_simple_batch / run_advanced_batch)
+    to (low, high) uniform ranges; other parameters take the values in fixed or the page
+    defaults. Uses n_samples * (D + 2) model evaluations, streamed in chunks of chunk_size
+    rows across a thread pool (NumPy releases the GIL inside the batched kernels), so
+    memory stays O(chunk_size * T) per worker. Returns a dict with 'names', 'S1' and
+    'ST', the latter two of shape (D, T); time steps with zero output variance are NaN.
+    """
+    run, params = _check(model, bounds, fixed)
+    names = list(bounds)
+    D = len(names)
+    t = np.asarray(t, dtype=float)
+    rng = np.random.default_rng(seed)
+    A = _scale(rng.random((n_samples, D)), bounds)
+    B = _scale(rng.random((n_samples, D)), bounds)
+
+    starts = range(0, n_samples, chunk_size)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(lambda i: _sobol_sums(run, params, names, A[i:i + chunk_size], B[i:i + chunk_size], t), starts))
+
+    first, total, counts, n, s1, s2 = (sum(p[k] for p in parts) for k in range(6))
+    mean = s1 / max(n, 1)
+    variance = s2 / max(n, 1) - mean ** 2
+    counts = np.maximum(counts, 1)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        S1 = np.where(variance > 0, first / counts / variance, np.nan)
+        ST = np.where(variance > 0, 0.5 * total / counts / variance, np.nan)
+    return {'names': names, 'S1': S1, 'ST': ST}
+
+# ----------------------
+# Morris Elementary Effects
+# ----------------------
+def morris_trajectories(n_trajectories, D, levels=4, rng=None):
+    """One-at-a-time Morris trajectories in the unit hypercube, shape (r, D + 1, D).
+
+    Also returns the (r, D) step signs and the (r, D) order in which factors move.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels) / (levels - 1)
+    start = rng.choice(grid, size=(n_trajectories, D))
+    # Step up where there is room, otherwise step down
+    sign = np.where(start + delta <= 1, 1.0, -1.0)
+    order = np.argsort(rng.random((n_trajectories, D)), axis=1)
+    steps = np.zeros((n_trajectories, D + 1, D))
+    rows = np.arange(n_trajectories)
+    steps[rows[:, None], np.arange(1, D + 1), order] = (sign * delta)[rows[:, None], order]
+    points = start[:, None, :] + np.cumsum(steps, axis=1)
+    return points, sign * delta, order
+
+
+def _morris_sums(run, params, names, bounds, points, delta, order, t):
+    """Count, sum, sum of magnitudes and M2 (sum of squared deviations from the chunk mean)
+    of the elementary effects of one chunk of trajectories, each (D, T).
+
+    Effects involving a non-finite output (infeasible slope triples) are skipped.
+    """
+    n, D = delta.shape
+    Y = _evaluate(run, params, names, _scale(points.reshape(-1, D), bounds), t).reshape(n, D + 1, t.size)
+    rows = np.arange(n)[:, None]
+    effects = np.empty((n, D, t.size))
+    effects[rows, order] = np.diff(Y, axis=1) / delta[rows, order][:, :, None]
+    finite = np.isfinite(effects)
+    effects[~finite] = 0.0
+    count = finite.sum(axis=0)
+    total = effects.sum(axis=0)
+    magnitude = np.abs(effects).sum(axis=0)
+    mean = total / np.maximum(count, 1)
+    effects -= mean
+    effects[~finite] = 0.0
+    return count, total, magnitude, (effects ** 2).sum(axis=0)
+
+
+def morris_effects(model, bounds, t, n_trajectories, fixed=None, levels=4, chunk_size=20000, workers=None, seed=None):
+    """Time-resolved Morris screening: mu, mu* and sigma of the elementary effects.
+
+    Elementary effects are expressed per unit of the normalised [0, 1] parameter range,
+    so factors with different units are directly comparable. Uses n_trajectories * (D + 1)
+    evaluations, streamed like sobol_indices in chunks of whole trajectories (about
+    chunk_size evaluations each) whose effects are reduced to running sums, so memory
+    stays O(chunk_size * T) per worker. Returns a dict with 'names', 'mu', 'mu_star' and
+    'sigma', each (D, T).
+    """
+    run, params = _check(model, bounds, fixed)
+    names = list(bounds)
+    D = len(names)
+    t = np.asarray(t, dtype=float)
+    points, delta, order = morris_trajectories(n_trajectories, D, levels, np.random.default_rng(seed))
+
+    per_chunk = max(1, chunk_size // (D + 1))
+    starts = range(0, n_trajectories, per_chunk)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(lambda i: _morris_sums(run, params, names, bounds, points[i:i + per_chunk], delta[i:i + per_chunk], order[i:i + per_chunk], t), starts))
+
+    # Chan's parallel update merges the chunks' second moments
+    count, total, magnitude, m2 = parts[0]
+    for part_count, part_total, part_magnitude, part_m2 in parts[1:]:
+        merged = count + part_count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            shift = np.nan_to_num(part_total / part_count - total / count)
+        m2 = m2 + part_m2 + shift ** 2 * count * part_count / np.maximum(merged, 1)
+        count, total, magnitude = merged, total + part_total, magnitude + part_magnitude
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'names': names,
+            'mu': np.where(count > 0, total / count, np.nan),
+            'mu_star': np.where(count > 0, magnitude / count, np.nan),
+            'sigma': np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan),
+        }
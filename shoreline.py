@@ -0,0 +1,413 @@
+import numpy as np
+
+# ----------------------
+# Sea Level Forcing
+# ----------------------
+def as_columns(*params):
+    """Broadcasts scenario parameters against each other and returns them as (N, 1) columns."""
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float)) for p in params))
+    return [a.reshape(-1, 1) for a in arrays]
+
+
+def sea_level_batch(t, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """Sea level eta(t) for N scenarios on a shared time axis, shape (N, T).
+
+    Parameters are scalars or arrays of shape (N,). A sinusoid with a period
+    of 0 is treated as disabled, matching the pages' checkbox behaviour.
+    """
+    t = np.asarray(t, dtype=float)
+    Z0, Zdot, A1, P1, A2, P2 = as_columns(Z0, Zdot, A1, P1, A2, P2)
+    eta = Z0 + Zdot * t
+    for A, P in ((A1, P1), (A2, P2)):
+        # Only rows with an enabled sinusoid pay for np.sin
+        rows = np.flatnonzero((P[:, 0] > 0) & (A[:, 0] != 0))
+        if rows.size:
+            eta[rows] += A[rows] * np.sin(2 * np.pi * t / P[rows])
+    return eta
+
+
+def sea_level(t, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """Sea level eta(t) element-wise: t and the parameters broadcast against each other.
+
+    For per-point parameters such as one scenario per root bracket; sea_level_batch is
+    the (N, T) form on a shared time axis.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = Z0 + Zdot * t
+    for A, P in ((A1, P1), (A2, P2)):
+        on = np.asarray(P) > 0
+        if np.any(on):
+            eta = eta + np.where(on, A * np.sin(2 * np.pi * t / np.where(on, P, 1.0)), 0.0)
+    return eta
+
+
+def sea_level_rate(t, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """d(eta)/dt of sea_level, element-wise."""
+    t = np.asarray(t, dtype=float)
+    rate = Zdot + 0.0 * t
+    for A, P in ((A1, P1), (A2, P2)):
+        on = np.asarray(P) > 0
+        if np.any(on):
+            safe_P = np.where(on, P, 1.0)
+            rate = rate + np.where(on, A * 2 * np.pi / safe_P * np.cos(2 * np.pi * t / safe_P), 0.0)
+    return rate
+
+def sea_level_jacobian(t, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """sea_level_batch plus d(eta)/d(parameter) for each forcing parameter; returns (eta, jac).
+
+    jac maps 'Z0', 'Zdot', 'A1', 'P1', 'A2', 'P2' to (N, T) arrays (constant ones may be
+    read-only broadcast views). Disabled sinusoids (period 0) have zero derivatives.
+    """
+    t = np.asarray(t, dtype=float)
+    Z0, Zdot, A1, P1, A2, P2 = as_columns(Z0, Zdot, A1, P1, A2, P2)
+    shape = (Z0.shape[0], t.size)
+    eta = Z0 + Zdot * t
+    jac = {'Z0': np.broadcast_to(1.0, shape), 'Zdot': np.broadcast_to(t, shape)}
+    for k, (A, P) in enumerate(((A1, P1), (A2, P2)), start=1):
+        d_A = np.zeros(shape)
+        d_P = np.zeros(shape)
+        rows = np.flatnonzero(P[:, 0] > 0)
+        if rows.size:
+            phase = 2 * np.pi * t / P[rows]
+            d_A[rows] = np.sin(phase)
+            d_P[rows] = -A[rows] * np.cos(phase) * phase / P[rows]
+            eta[rows] += A[rows] * d_A[rows]
+        jac[f'A{k}'] = d_A
+        jac[f'P{k}'] = d_P
+    return eta, jac
+
+# ----------------------
+# Simple Box Model
+# ----------------------
+def shoreline_location(Qs, eta, t):
+    """Shoreline location box model (eta is calculated externally, or a forcing.Forcing evaluated on t)"""
+    eta = eta(t) if callable(eta) else eta
+    # Ensure X=0 at t=0 and prevent division by zero or negative eta
+    X = np.zeros_like(t, dtype=float)
+    valid_mask = (eta > 0) & (t > 0)
+    if np.any(valid_mask):
+        X[valid_mask] = (Qs * t[valid_mask]) / eta[valid_mask]
+    return X
+
+
+def _simple_kernel(scale, volume, eta, t):
+    """X = scale * volume / eta where eta > 0 and t > 0, else 0 (shared by the batched entry points)."""
+    X = np.zeros(np.broadcast_shapes(eta.shape, t.shape, volume.shape, scale.shape), dtype=float)
+    np.divide(volume, eta, out=X, where=(eta > 0) & (t > 0))
+    X *= scale
+    return X
+
+
+def shoreline_location_batch(Qs, eta, t):
+    """Batched box model: Qs of shape (N,) or scalar, eta of shape (N, T), t of shape (T,).
+
+    Same validity rules as shoreline_location: X = Qs*t/eta where eta > 0 and t > 0, else 0.
+    eta may also be a forcing.Forcing, evaluated (and memoized) on t.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta(t) if callable(eta) else eta, dtype=float)
+    Qs = np.asarray(Qs, dtype=float)
+    Qs = Qs.reshape(-1, 1) if Qs.ndim else Qs
+    return _simple_kernel(Qs, t, eta, t)
+
+
+def shoreline_location_volume(V, eta, t):
+    """Batched box model driven by the cumulative sediment volume V(t) instead of Qs * t.
+
+    V and eta are (N, T) or (T,); X = V / eta where eta > 0 and t > 0, else 0.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    return _simple_kernel(np.ones(()), np.asarray(V, dtype=float), eta, t)
+
+
+def shoreline_location_jacobian(Qs, eta, t):
+    """shoreline_location_batch plus its partial derivatives; returns (X, jac).
+
+    jac['Qs'] = t / eta and jac['eta'] = -X / eta on valid samples (0 elsewhere), each of
+    the broadcast (N, T) shape. Chain jac['eta'] with sea_level_jacobian for forcing terms.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    X = shoreline_location_batch(Qs, eta, t)
+    valid = np.broadcast_to((eta > 0) & (t > 0), X.shape)
+    d_Qs = np.zeros(X.shape)
+    np.divide(t, eta, out=d_Qs, where=valid)
+    d_eta = np.zeros(X.shape)
+    np.divide(X, eta, out=d_eta, where=valid)
+    np.negative(d_eta, out=d_eta)
+    return X, {'Qs': d_Qs, 'eta': d_eta}
+
+
+def run_simple_batch(t, Qs, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """Evaluates N simple-model scenarios in one vectorized pass; returns (eta, X), each (N, T)."""
+    eta = sea_level_batch(t, Z0, Zdot, A1, P1, A2, P2)
+    X = shoreline_location_batch(Qs, eta, t)
+    return eta, X
+
+
+def run_simple_batch_jacobian(t, Qs, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """run_simple_batch plus dX/d(parameter) for Qs and every forcing parameter; returns (eta, X, jac)."""
+    eta, d_eta = sea_level_jacobian(t, Z0, Zdot, A1, P1, A2, P2)
+    X, d_X = shoreline_location_jacobian(Qs, eta, t)
+    jac = {'Qs': d_X['Qs'], **{name: d_X['eta'] * d for name, d in d_eta.items()}}
+    return eta, X, jac
+
+# ----------------------
+# Advanced Model with Slopes
+# ----------------------
+def shoreline_location_advanced(q_s, eta, t, S_t, S_f, S_b, engine='analytic'):
+    """Advanced shoreline location model with topset, foreset, basement slopes
+
+    engine='numerical' uses the moving-boundary mass-balance solver in solver.py,
+    which stays valid for arbitrary eta(t) histories. eta may be a forcing.Forcing.
+    """
+    eta = eta(t) if callable(eta) else eta
+    if engine == 'numerical':
+        from solver import shoreline_location_advanced_numerical
+        return shoreline_location_advanced_numerical(q_s, eta, t, S_t, S_f, S_b)
+    if engine != 'analytic':
+        raise ValueError(f"Unknown engine '{engine}', expected 'analytic' or 'numerical'")
+    # Ensure s=0 at t=0 and prevent division by zero or negative eta
+    s = np.zeros_like(t, dtype=float)
+    valid_mask = (eta > 0) & (t > 0)
+
+    # Prevent invalid slope relationships
+    if not slope_feasibility(S_t, S_f, S_b):
+        return np.full_like(t, np.nan)
+
+    if np.any(valid_mask):
+        denom = slope_denominator(S_t, S_f, S_b)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sqrt_arg = (2 * q_s * t[valid_mask]) / denom
+            sqrt_arg = np.where(sqrt_arg < 0, 0, sqrt_arg)
+            s[valid_mask] = -eta[valid_mask] / S_b + np.sqrt(sqrt_arg)
+
+    return s
+
+
+def slope_feasibility(S_t, S_f, S_b):
+    """Element-wise check of 0 < S_t < S_b < S_f for arrays of slope triples."""
+    S_t, S_f, S_b = np.broadcast_arrays(*(np.asarray(S, dtype=float) for S in (S_t, S_f, S_b)))
+    return (S_t > 0) & (S_t < S_b) & (S_b < S_f)
+
+
+def slope_denominator(S_t, S_f, S_b):
+    """S_b (alpha + beta) with alpha = S_t / (S_b - S_t), beta = S_f / (S_f - S_b); NaN where infeasible."""
+    feasible = slope_feasibility(S_t, S_f, S_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(feasible, S_b * (S_t / (S_b - S_t) + S_f / (S_f - S_b)), np.nan)
+
+
+def _advanced_kernel(scale, volume, eta, t, S_t, S_f, S_b):
+    """s = sqrt(2 * scale * volume / denom) - eta / S_b on valid samples; slopes are (N, 1) columns."""
+    feasible = slope_feasibility(S_t, S_f, S_b)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = 2 * scale / slope_denominator(S_t, S_f, S_b)
+
+        shape = np.broadcast_shapes(eta.shape, t.shape, volume.shape, rate.shape)
+        valid = np.broadcast_to((eta > 0) & (t > 0), shape)
+        s = np.zeros(shape, dtype=float)
+        np.multiply(rate, volume, out=s, where=valid)
+        np.maximum(s, 0, out=s)
+        np.sqrt(s, out=s)
+        np.subtract(s, eta / S_b, out=s, where=valid)
+
+    feasible = np.broadcast_to(feasible[:, 0], s.shape[:1]).copy()
+    s[~feasible] = np.nan
+    return s, feasible
+
+
+def shoreline_location_advanced_batch(q_s, eta, t, S_t, S_f, S_b):
+    """Batched advanced model for N slope triples; returns (s, feasible).
+
+    q_s, S_t, S_f and S_b are scalars or arrays of shape (N,), eta is (N, T) or (T,)
+    and t is (T,). Rows whose slopes break 0 < S_t < S_b < S_f are NaN and flagged
+    False in the (N,) feasibility mask; the rest of the batch is unaffected. eta may
+    also be a forcing.Forcing, evaluated (and memoized) on t.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta(t) if callable(eta) else eta, dtype=float)
+    q_s, S_t, S_f, S_b = as_columns(q_s, S_t, S_f, S_b)
+    return _advanced_kernel(q_s, t, eta, t, S_t, S_f, S_b)
+
+
+def shoreline_location_advanced_volume(V, eta, t, S_t, S_f, S_b):
+    """Batched advanced model driven by the cumulative supply V(t) instead of q_s * t; returns (s, feasible)."""
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    S_t, S_f, S_b = as_columns(S_t, S_f, S_b)
+    return _advanced_kernel(np.ones((1, 1)), np.asarray(V, dtype=float), eta, t, S_t, S_f, S_b)
+
+
+def shoreline_location_advanced_jacobian(q_s, eta, t, S_t, S_f, S_b):
+    """shoreline_location_advanced_batch plus its partial derivatives; returns (s, feasible, jac).
+
+    jac maps 'q_s', 'S_t', 'S_f', 'S_b' and 'eta' to (N, T) arrays of ds/d(parameter),
+    using alpha = S_t / (S_b - S_t), beta = S_f / (S_f - S_b) and their closed-form
+    derivatives. Derivatives are 0 on samples where s is pinned to 0, NaN on infeasible rows.
+    """
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    s, feasible = shoreline_location_advanced_batch(q_s, eta, t, S_t, S_f, S_b)
+    q_s, S_t, S_f, S_b = as_columns(q_s, S_t, S_f, S_b)
+    valid = np.broadcast_to((eta > 0) & (t > 0), s.shape)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        alpha = S_t / (S_b - S_t)
+        beta = S_f / (S_f - S_b)
+        denom = S_b * (alpha + beta)
+        d_denom = {
+            'S_t': S_b * S_b / (S_b - S_t) ** 2,
+            'S_f': -S_b * S_b / (S_f - S_b) ** 2,
+            'S_b': alpha + beta + S_b * (S_f / (S_f - S_b) ** 2 - S_t / (S_b - S_t) ** 2),
+        }
+        # root = sqrt(2 q_s t / denom); ds/d(denom) = -root / (2 denom)
+        root = np.sqrt(np.maximum(2 * q_s * t / denom, 0))
+        d_s_d_denom = np.where(valid, -root / (2 * denom), 0.0)
+        jac = {
+            'q_s': np.where(valid, root / (2 * q_s), 0.0),
+            'S_t': d_s_d_denom * d_denom['S_t'],
+            'S_f': d_s_d_denom * d_denom['S_f'],
+            'S_b': np.where(valid, eta / S_b ** 2, 0.0) + d_s_d_denom * d_denom['S_b'],
+            'eta': np.where(valid, -1 / S_b, 0.0),
+        }
+    for d in jac.values():
+        d[~feasible] = np.nan
+    return s, feasible, jac
+
+
+def run_advanced_batch(t, q_s, S_t, S_f, S_b, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """Evaluates N advanced-model scenarios in one vectorized pass; returns (eta, s, feasible)."""
+    eta = sea_level_batch(t, Z0, Zdot, A1, P1, A2, P2)
+    s, feasible = shoreline_location_advanced_batch(q_s, eta, t, S_t, S_f, S_b)
+    return eta, s, feasible
+
+
+def run_advanced_batch_jacobian(t, q_s, S_t, S_f, S_b, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """run_advanced_batch plus ds/d(parameter) for q_s, the slopes and every forcing parameter.
+
+    Returns (eta, s, feasible, jac).
+    """
+    eta, d_eta = sea_level_jacobian(t, Z0, Zdot, A1, P1, A2, P2)
+    s, feasible, d_s = shoreline_location_advanced_jacobian(q_s, eta, t, S_t, S_f, S_b)
+    jac = {name: d_s[name] for name in ('q_s', 'S_t', 'S_f', 'S_b')}
+    jac.update({name: d_s['eta'] * d for name, d in d_eta.items()})
+    return eta, s, feasible, jac
+
+# ----------------------
+# Allocation-Free Kernels
+# ----------------------
+# Unit roundoff of float32 (2^-24). With float32 buffers and float32 (or float64) inputs,
+# the kernels below stay within, to first order in u:
+#   simple:   |X32 - X| <= 5 u |X|                               (~3.0e-7 relative)
+#   advanced: |s32 - s| <= 4 u (sqrt(2 q_s t / denom) + eta / S_b) + u |s|
+# given eta; rounding of the inputs is included. The advanced bound is absolute in the
+# size of the two terms of s, so the relative error grows where they cancel (s -> 0).
+# Errors in a float32 eta propagate with the model's sensitivity: |dX| = |X| |d eta| / eta
+# and |ds| = |d eta| / S_b, where sea_level_into gives |d eta| <= 4 u (|Z0| + |Zdot t| + sum |A| (1 + 2 pi t / P)).
+FLOAT32_UNIT_ROUNDOFF = np.finfo(np.float32).eps / 2
+
+
+class KernelWorkspace:
+    """Reusable output and scratch buffers for the allocation-free *_into kernels.
+
+    shape is the (N, T) batch shape and dtype float64 or float32 (half the memory traffic,
+    see FLOAT32_UNIT_ROUNDOFF for the accuracy bound). Allocate once and pass it to every
+    rerun with the same shape; the kernels then create no (N, T) temporaries at all.
+    """
+
+    def __init__(self, shape, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported kernel dtype '{dtype}', expected float32 or float64")
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.eta = np.empty(self.shape, dtype=dtype)
+        self.out = np.empty(self.shape, dtype=dtype)
+        self.scratch = np.empty(self.shape, dtype=dtype)
+        self.valid = np.empty(self.shape, dtype=bool)
+        self.positive_t = np.empty(self.shape[-1:], dtype=bool)
+
+
+def _valid_into(eta, t, workspace):
+    """Fills workspace.valid with (eta > 0) & (t > 0) in place."""
+    np.greater(t, 0, out=workspace.positive_t)
+    np.greater(eta, 0, out=workspace.valid)
+    np.logical_and(workspace.valid, workspace.positive_t, out=workspace.valid)
+    return workspace.valid
+
+
+def sea_level_into(t, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0, *, workspace, out=None):
+    """sea_level_batch written into out (default workspace.eta) without (N, T) temporaries."""
+    out = workspace.eta if out is None else out
+    Z0, Zdot, A1, P1, A2, P2 = (c.astype(out.dtype) for c in as_columns(Z0, Zdot, A1, P1, A2, P2))
+    np.multiply(Zdot, t, out=out)
+    np.add(out, Z0, out=out)
+    phase = workspace.scratch
+    for A, P in ((A1, P1), (A2, P2)):
+        on = (P > 0) & (A != 0)
+        if not on.any():
+            continue
+        omega = 2 * np.pi / np.where(on, P, 1)
+        np.multiply(omega, t, out=phase, where=on)
+        np.sin(phase, out=phase, where=on)
+        np.multiply(phase, A, out=phase, where=on)
+        np.add(out, phase, out=out, where=on)
+    return out
+
+
+def shoreline_location_into(Qs, eta, t, workspace, out=None):
+    """shoreline_location_batch written into out (default workspace.out); returns out.
+
+    X = Qs * t / eta on valid samples and 0 elsewhere, computed with masked in-place ufuncs
+    in the workspace dtype. Qs is a scalar or (N,) array, eta (N, T) or (T,) and t (T,).
+    """
+    out = workspace.out if out is None else out
+    Qs, = (c.astype(out.dtype) for c in as_columns(Qs))
+    valid = _valid_into(eta, t, workspace)
+    out.fill(0)
+    np.divide(t, eta, out=out, where=valid)
+    np.multiply(out, Qs, out=out)
+    return out
+
+
+def shoreline_location_advanced_into(q_s, eta, t, S_t, S_f, S_b, workspace, out=None):
+    """shoreline_location_advanced_batch written into out (default workspace.out); returns (out, feasible).
+
+    Only the (N, 1) slope coefficients are evaluated in float64; every (N, T) step runs in
+    place in the workspace dtype. Infeasible rows are NaN, as in the allocating kernel.
+    """
+    out = workspace.out if out is None else out
+    q_s, S_t, S_f, S_b = as_columns(q_s, S_t, S_f, S_b)
+    feasible = slope_feasibility(S_t, S_f, S_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = (2 * q_s / slope_denominator(S_t, S_f, S_b)).astype(out.dtype)
+    S_b = S_b.astype(out.dtype)
+    valid = _valid_into(eta, t, workspace)
+
+    out.fill(0)
+    np.multiply(rate, t, out=out, where=valid)
+    np.maximum(out, 0, out=out)
+    np.sqrt(out, out=out)
+    np.divide(eta, S_b, out=workspace.scratch)
+    np.subtract(out, workspace.scratch, out=out, where=valid)
+    feasible = np.broadcast_to(feasible[:, 0], out.shape[:1])
+    if not feasible.all():
+        np.copyto(out, np.nan, where=~feasible[:, None])
+    return out, feasible.copy()
+
+
+def run_simple_into(t, Qs, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0, *, workspace):
+    """run_simple_batch into a KernelWorkspace; returns the (eta, X) buffers (overwritten on reuse)."""
+    eta = sea_level_into(t, Z0, Zdot, A1, P1, A2, P2, workspace=workspace)
+    return eta, shoreline_location_into(Qs, eta, t, workspace)
+
+
+def run_advanced_into(t, q_s, S_t, S_f, S_b, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0, *, workspace):
+    """run_advanced_batch into a KernelWorkspace; returns (eta, s, feasible), eta and s being its buffers."""
+    eta = sea_level_into(t, Z0, Zdot, A1, P1, A2, P2, workspace=workspace)
+    s, feasible = shoreline_location_advanced_into(q_s, eta, t, S_t, S_f, S_b, workspace)
+    return eta, s, feasible
@@ -0,0 +1,185 @@
+import numpy as np
+
+from shoreline import as_columns, slope_feasibility, shoreline_location_advanced_volume
+from supply import cumulative_supply
+
+try:
+    import numba
+except ImportError:  # numba is in requirements.txt; without it the cell loops fall back to (much slower) NumPy
+    numba = None
+
+# ----------------------
+# Moving-Boundary Mass Balance
+# ----------------------
+# The deposit is tracked as a surface z(x) on a uniform grid above the basement z_b(x) = -S_b x
+# (sea level eta is measured from the basement at x = 0). Each step the wedge with its apex at
+# the shoreline (s, eta) - topset slope S_t landward, foreset slope S_f seaward - is placed so
+# that the sediment it adds above the current surface equals the supplied volume, then the
+# surface becomes max(z, wedge). Earlier deposits are never eroded, so stranded topsets and
+# forced-regression wedges are kept. When every new wedge contains the previous one (e.g.
+# steady sea-level rise) this reduces to the closed form of shoreline_location_advanced.
+def _wedge_window(s, e, S_t, S_f, S_b, x0, dx, n_cells):
+    """Index range of the cells where the wedge with apex (s, e) lies above the basement."""
+    land = -(e + S_t * s) / (S_b - S_t)
+    toe = (e + S_f * s) / (S_f - S_b)
+    lo = min(max(int((land - x0) / dx), 0), n_cells)
+    hi = min(max(int((toe - x0) / dx) + 1, 0), n_cells)
+    return lo, hi
+
+
+def _added_area_loop(z, x, lo, hi, s, e, S_t, S_f):
+    """Area (in cell widths) the wedge adds above z, and its derivative with respect to s."""
+    area = 0.0
+    slope = 0.0
+    for i in range(lo, hi):
+        rate = S_t if x[i] < s else S_f
+        gap = e + rate * (s - x[i]) - z[i]
+        if gap > 0:
+            area += gap
+            slope += rate
+    return area, slope
+
+
+def _deposit_loop(z, x, lo, hi, s, e, S_t, S_f):
+    for i in range(lo, hi):
+        rate = S_t if x[i] < s else S_f
+        z[i] = max(z[i], e + rate * (s - x[i]))
+
+
+def _added_area_numpy(z, x, lo, hi, s, e, S_t, S_f):
+    xs = x[lo:hi]
+    rate = np.where(xs < s, S_t, S_f)
+    gap = e + rate * (s - xs) - z[lo:hi]
+    above = gap > 0
+    return gap[above].sum(), rate[above].sum()
+
+
+def _deposit_numpy(z, x, lo, hi, s, e, S_t, S_f):
+    xs = x[lo:hi]
+    np.maximum(z[lo:hi], e + np.where(xs < s, S_t, S_f) * (s - xs), out=z[lo:hi])
+
+
+def _make_solver(added_area, deposit, wedge_window):
+    def solve_one(t, eta, volume, S_t, S_f, S_b, x0, dx, n_cells, out):
+        x = x0 + dx * (np.arange(n_cells) + 0.5)
+        z = -S_b * x
+        s = -eta[0] / S_b
+        out[0] = s
+        for k in range(1, t.size):
+            e = eta[k]
+            target = (volume[k] - volume[k - 1]) / dx
+            # No wedge with its apex below the basement adds sediment: A(lo) = 0
+            lo = -e / S_b
+            hi = max(s, lo) + dx
+            for _ in range(200):
+                a_lo, a_hi = wedge_window(hi, e, S_t, S_f, S_b, x0, dx, n_cells)
+                if added_area(z, x, a_lo, a_hi, hi, e, S_t, S_f)[0] > target:
+                    break
+                lo, hi = hi, hi + 2 * (hi - lo)
+            # Safeguarded Newton on the monotone added-area function A(s) = target
+            s = hi
+            for _ in range(100):
+                w_lo, w_hi = wedge_window(s, e, S_t, S_f, S_b, x0, dx, n_cells)
+                area, slope = added_area(z, x, w_lo, w_hi, s, e, S_t, S_f)
+                if area > target:
+                    hi = s
+                else:
+                    lo = s
+                if abs(area - target) <= 1e-12 * max(target, 1e-300) or hi - lo <= 1e-12 * dx:
+                    break
+                step = s - (area - target) / slope if slope > 0 else lo
+                s = step if lo < step < hi else 0.5 * (lo + hi)
+            w_lo, w_hi = wedge_window(s, e, S_t, S_f, S_b, x0, dx, n_cells)
+            deposit(z, x, w_lo, w_hi, s, e, S_t, S_f)
+            out[k] = s
+
+    def solve_batch(t, eta, volume, S_t, S_f, S_b, x0, dx, n_cells, out):
+        for n in range(out.shape[0]):
+            solve_one(t, eta[n], volume[n], S_t[n], S_f[n], S_b[n], x0[n], dx[n], n_cells, out[n])
+
+    return solve_one, solve_batch
+
+
+if numba is not None:
+    _jit = numba.njit(cache=True)
+    _solve_one, _ = _make_solver(_jit(_added_area_loop), _jit(_deposit_loop), _jit(_wedge_window))
+    _solve_one = _jit(_solve_one)
+
+    @numba.njit(parallel=True, cache=True)
+    def _solve_batch(t, eta, volume, S_t, S_f, S_b, x0, dx, n_cells, out):
+        for n in numba.prange(out.shape[0]):
+            _solve_one(t, eta[n], volume[n], S_t[n], S_f[n], S_b[n], x0[n], dx[n], n_cells, out[n])
+else:
+    _, _solve_batch = _make_solver(_added_area_numpy, _deposit_numpy, _wedge_window)
+
+
+def _grid_extent(volume, eta, S_t, S_f, S_b, margin):
+    """Per-scenario x range covering the closed-form wedge over the whole run, padded by margin."""
+    alpha = S_t / (S_b - S_t)
+    beta = S_f / (S_f - S_b)
+    y = np.sqrt(np.maximum(2 * volume / (S_b * (alpha + beta)), 0))
+    s = y - eta / S_b
+    land = np.minimum(s - S_b * y / (S_b - S_t), -eta / S_b).min(axis=1)
+    toe = (s + S_b * y / (S_f - S_b)).max(axis=1)
+    span = np.maximum(toe - land, 1e-9)
+    return land - margin * span, (1 + 2 * margin) * span
+
+# ----------------------
+# Public Engine
+# ----------------------
+def solve_advanced(q_s, eta, t, S_t, S_f, S_b, n_cells=512, margin=0.5):
+    """Numerical moving-boundary solution of the advanced model for N scenarios; returns (s, feasible).
+
+    q_s is a scalar, (N,) constant supply or an (N, T) supply-rate history; eta is (T,) or
+    (N, T) and may be any sea-level history; t is (T,). Each scenario's deposit is resolved
+    on n_cells cells spanning its closed-form extent padded by margin on both sides. Like
+    the closed form, s is reported as 0 where eta <= 0 or t <= 0 and NaN on infeasible rows.
+    The time loop is compiled with numba (a requirement) and runs parallel over scenarios;
+    the NumPy fallback used without numba is only meant for small runs.
+    """
+    t = np.asarray(t, dtype=float)
+    q_s = np.asarray(q_s, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    S_t, S_f, S_b = as_columns(S_t, S_f, S_b)
+    supply = q_s.reshape(-1, 1) if q_s.ndim == 1 else q_s
+    volume = cumulative_supply(supply, t)
+    shape = np.broadcast_shapes(volume.shape, np.atleast_2d(eta).shape, S_b.shape)
+    volume = np.ascontiguousarray(np.broadcast_to(volume, shape))
+    eta = np.ascontiguousarray(np.broadcast_to(eta, shape))
+    S_t, S_f, S_b = (np.ascontiguousarray(np.broadcast_to(S, (shape[0], 1))) for S in (S_t, S_f, S_b))
+    feasible = slope_feasibility(S_t, S_f, S_b)[:, 0]
+
+    s = np.full(shape, np.nan)
+    rows = np.flatnonzero(feasible)
+    if rows.size:
+        St, Sf, Sb = S_t[rows], S_f[rows], S_b[rows]
+        x0, width = _grid_extent(volume[rows], eta[rows], St, Sf, Sb, margin)
+        out = np.empty((rows.size, t.size))
+        _solve_batch(t, eta[rows], volume[rows], St[:, 0], Sf[:, 0], Sb[:, 0], x0, width / n_cells, n_cells, out)
+        out[~((eta[rows] > 0) & (t > 0))] = 0.0
+        s[rows] = out
+    return s, feasible
+
+
+def shoreline_location_advanced_numerical(q_s, eta, t, S_t, S_f, S_b):
+    """Drop-in numerical engine with the signature of shoreline_location_advanced."""
+    s, _ = solve_advanced(q_s, eta, t, S_t, S_f, S_b)
+    return s[0]
+
+
+def cross_check_advanced(q_s, eta, t, S_t, S_f, S_b, n_cells=512):
+    """Runs the numerical and closed-form engines side by side on the same inputs.
+
+    Returns a dict with both (N, T) solutions and the per-scenario maximum absolute
+    difference over valid samples. The difference is grid error while every new wedge
+    buries the previous one, and grows where sea-level falls strand the earlier deposit.
+    """
+    numerical, feasible = solve_advanced(q_s, eta, t, S_t, S_f, S_b, n_cells)
+    t = np.asarray(t, dtype=float)
+    q_s = np.asarray(q_s, dtype=float)
+    volume = cumulative_supply(q_s.reshape(-1, 1) if q_s.ndim == 1 else q_s, t)
+    analytic, _ = shoreline_location_advanced_volume(volume, eta, t, S_t, S_f, S_b)
+    analytic = np.broadcast_to(analytic, numerical.shape)
+    with np.errstate(invalid='ignore'):
+        max_abs_error = np.nanmax(np.abs(numerical - analytic), axis=1, initial=0.0)
+    return {'numerical': numerical, 'analytic': analytic, 'feasible': feasible, 'max_abs_error': max_abs_error}
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from sweep import check_model
+
+# ----------------------
+# Content Keys
+# ----------------------
+# Bump a model's version whenever its equations or page pipeline change, so stored results
+# computed by older code are never served.
+MODEL_VERSIONS = {'simple': 2, 'advanced': 1}
+
+
+def _canonical(value):
+    """Hashable, type-stable form of a parameter: numbers as floats (so 250 and 250.0 agree)."""
+    if isinstance(value, (bool, np.bool_, str)) or value is None:
+        return value
+    if isinstance(value, (tuple, list)):
+        return tuple(_canonical(v) for v in value)
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        return float(value) + 0.0
+    return value.shape, hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest()
+
+
+def result_key(model, **params):
+    """Stable digest of a model name, its version and parameters (arrays such as t by content).
+
+    Independent of keyword order and of int/float, and identical across processes.
+    """
+    canonical = (model, MODEL_VERSIONS.get(model)) + tuple((name, _canonical(params[name])) for name in sorted(params))
+    return hashlib.blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
+
+# ----------------------
+# On-Disk Store
+# ----------------------
+# Each entry is a directory of .npy files named after its key, plus a row in an SQLite index
+# holding its size, last use and JSON metrics. Entries are written into a private temporary
+# directory and renamed into place, so other processes see an entry completely or not at
+# all; if two processes compute the same key, the first rename wins. Hits are memory-mapped.
+DEFAULT_STORE_DIR = os.path.join(tempfile.gettempdir(), 'delta-shoreline-store')
+MAX_STORE_BYTES = 1024 * 2**20
+
+
+class ResultStore:
+    """Content-addressed store of named arrays and metrics, shared by every process on a host.
+
+    Evicts least recently used entries once the stored arrays exceed max_bytes in total.
+    """
+
+    def __init__(self, directory=None, max_bytes=MAX_STORE_BYTES):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = directory or DEFAULT_STORE_DIR
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def _db(self):
+        # sqlite3 connections belong to one thread; each thread (session) opens its own
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            os.makedirs(os.path.join(self.directory, 'tmp'), exist_ok=True)
+            db = sqlite3.connect(os.path.join(self.directory, 'index.sqlite'), timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, names TEXT, bytes INTEGER, last_used REAL, metrics TEXT)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+            self._local.db = db
+        return db
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def info(self):
+        """Number of entries and their total size in bytes."""
+        n, total = self._db().execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        return {'entries': n, 'bytes': total}
+
+    def get(self, key):
+        """(arrays, metrics) for key with read-only memory-mapped arrays, or None on a miss."""
+        db = self._db()
+        row = db.execute("SELECT names, metrics FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        path = self._path(key)
+        try:
+            arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in json.loads(row[0])}
+        except FileNotFoundError:
+            # Evicted by another process between the lookup and the load
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return arrays, json.loads(row[1])
+
+    def put(self, key, arrays, metrics=None):
+        """Atomically stores named arrays and JSON-serializable metrics under key."""
+        path = self._path(key)
+        partial = os.path.join(self.directory, 'tmp', f'{key}.{uuid.uuid4().hex}')
+        os.makedirs(partial)
+        try:
+            nbytes = 0
+            for name, array in arrays.items():
+                array = np.asarray(array)
+                np.save(os.path.join(partial, f'{name}.npy'), array)
+                nbytes += array.nbytes
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.rename(partial, path)
+            except OSError:
+                # Another process stored this key first; its entry is identical
+                if not os.path.isdir(path):
+                    raise
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                   (key, json.dumps(list(arrays)), nbytes, time.time(), json.dumps(metrics or {})))
+        self._evict(keep=key)
+
+    def _evict(self, keep):
+        db = self._db()
+        total, = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        for key, nbytes in db.execute("SELECT key, bytes FROM entries WHERE key != ? ORDER BY last_used", (keep,)).fetchall():
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            # Readers that already memory-mapped the files keep their pages after the unlink
+            shutil.rmtree(self._path(key), ignore_errors=True)
+            total -= nbytes
+            if total <= self.max_bytes:
+                break
+
+    def get_or_compute(self, key, compute):
+        """Stored (arrays, metrics) for key; on a miss compute() returns them and they are stored."""
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        arrays, metrics = compute()
+        self.put(key, arrays, metrics)
+        return self.get(key) or (arrays, metrics)
+
+    def clear(self):
+        db = self._db()
+        for key, in db.execute("SELECT key FROM entries").fetchall():
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+
+STORE = ResultStore()
+
+# ----------------------
+# Batch Runs
+# ----------------------
+def stored_run(model, t, store=STORE, **params):
+    """run_simple_batch / run_advanced_batch on t through the store; returns the same tuple.
+
+    Keyed by model, version, parameters and the exact time axis, so repeated batch runs
+    (in any process) are served as memory-mapped arrays.
+    """
+    run, _ = check_model(model, params)
+    t = np.asarray(t, dtype=float)
+    names = ('eta', 'X') if model == 'simple' else ('eta', 's', 'feasible')
+
+    def compute():
+        return dict(zip(names, run(t, **params))), {}
+
+    arrays, _ = store.get_or_compute(result_key(model, t=t, **params), compute)
+    return tuple(arrays[name] for name in names)
@@ -0,0 +1,137 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from planform import display_stride
+from shoreline import slope_feasibility
+
+# ----------------------
+# Deposit Surfaces
+# ----------------------
+# Same geometry as the numerical engine in solver.py: the basement is z_b(x) = -S_b x and at
+# each time step the delta is the wedge with its apex at the shoreline (s, eta), topset slope
+# S_t landward and foreset slope S_f seaward. Nothing is eroded, so the deposit surface after
+# step k is the running maximum of the basement and every wedge so far, and a cell (x, z) was
+# deposited at the first step whose surface reaches z. Each x column is independent, which is
+# what the bounded-memory mode exploits.
+FACIES = {0: 'hiatus', 1: 'topset', 2: 'foreset'}
+
+
+def _check_trajectory(t, s, eta, S_t, S_f, S_b):
+    t, s, eta = (np.asarray(a, dtype=float) for a in (t, s, eta))
+    if not (t.ndim == 1 and s.shape == t.shape and eta.shape == t.shape):
+        raise ValueError("t, s and eta must be (T,) arrays of one trajectory")
+    if not slope_feasibility(S_t, S_f, S_b):
+        raise ValueError("Slopes must satisfy 0 < S_t < S_b < S_f")
+    # Samples where the model pins s to 0 (eta <= 0 or t <= 0) deposit nothing
+    active = (eta > 0) & (t > 0) & np.isfinite(s)
+    return t, s, eta, active
+
+
+def section_extent(s, eta, S_t, S_f, S_b, margin=0.05):
+    """(x_min, x_max, z_min, z_max) covering every wedge of the trajectory, padded by margin."""
+    # Landward pinch-out on the basement and toe of the foreset for each apex
+    land = -(eta + S_t * s) / (S_b - S_t)
+    toe = (eta + S_f * s) / (S_f - S_b)
+    x_min, x_max = min(land.min(), (-eta / S_b).min()), toe.max()
+    pad = margin * (x_max - x_min)
+    x_min, x_max = x_min - pad, x_max + pad
+    z_min, z_max = -S_b * x_max, max(-S_b * x_min, eta.max())
+    return x_min, x_max, z_min, z_max
+
+
+def deposit_surfaces(x, s, eta, active, S_t, S_f, S_b):
+    """(T + 1, len(x)) deposit surfaces: row 0 is the basement, row k + 1 the surface after step k."""
+    x = np.asarray(x, dtype=float)
+    basement = -S_b * x
+    wedge = eta[:, None] + np.where(x < s[:, None], S_t, S_f) * (s[:, None] - x)
+    wedge[~active] = -np.inf
+    surfaces = np.empty((s.size + 1, x.size))
+    surfaces[0] = basement
+    np.maximum(wedge, basement, out=surfaces[1:])
+    np.maximum.accumulate(surfaces, axis=0, out=surfaces)
+    return surfaces
+
+
+def _column_blocks(n_columns, n_rows, memory_budget):
+    """Column slices sized so the per-block surfaces fit in memory_budget bytes (all at once if None)."""
+    width = n_columns if memory_budget is None else max(1, int(memory_budget // (3 * 8 * n_rows)))
+    return [slice(lo, min(lo + width, n_columns)) for lo in range(0, n_columns, width)]
+
+# ----------------------
+# Synthetic Sections
+# ----------------------
+def synthetic_section(t, s, eta, S_t, S_f, S_b, nx=1000, nz=1000, extent=None, memory_budget=None):
+    """Gridded dip section of deposition ages from one (s, eta) shoreline trajectory.
+
+    Returns a dict with cell centres 'x' (nx,) and 'z' (nz,), 'age' (nz, nx) holding the
+    time each cell was filled (NaN for basement and for cells never filled, i.e. water or
+    air) and the final deposit 'surface' (nx,). extent is (x_min, x_max, z_min, z_max),
+    section_extent by default. With memory_budget (bytes) the section is built in column
+    blocks so the (T, nx) surfaces are never held at once; otherwise in one pass.
+    """
+    t, s, eta, active = _check_trajectory(t, s, eta, S_t, S_f, S_b)
+    if extent is None:
+        extent = section_extent(s[active], eta[active], S_t, S_f, S_b) if active.any() else (0.0, 1.0, -S_b, 0.0)
+    x_min, x_max, z_min, z_max = extent
+    x = x_min + (x_max - x_min) * (np.arange(nx) + 0.5) / nx
+    z = z_min + (z_max - z_min) * (np.arange(nz) + 0.5) / nz
+    # The age of the sample before deposition (index 0) and of unfilled cells (T + 1) is NaN
+    ages = np.concatenate([[np.nan], t, [np.nan]])
+
+    age = np.empty((nz, nx))
+    surface = np.empty(nx)
+    for block in _column_blocks(nx, t.size + 1, memory_budget):
+        surfaces = deposit_surfaces(x[block], s, eta, active, S_t, S_f, S_b)
+        surface[block] = surfaces[-1]
+        for i, column in zip(range(block.start, block.stop), surfaces.T):
+            # Surfaces only grow, so the first step reaching z is a binary search
+            age[:, i] = ages[np.searchsorted(column, z, side='left')]
+    return {'x': x, 'z': z, 'age': age, 'surface': surface}
+
+
+def wheeler_diagram(t, s, eta, S_t, S_f, S_b, nx=1000, extent=None, memory_budget=None):
+    """Chronostratigraphic (Wheeler) diagram: where and what was deposited at each time step.
+
+    Returns a dict with 'x' (nx,), 't' (T,), 'thickness' (T, nx) deposited per step and
+    'facies' (T, nx) int8 codes (see FACIES): 0 hiatus, 1 topset (landward of the
+    shoreline), 2 foreset. memory_budget works as in synthetic_section.
+    """
+    t, s, eta, active = _check_trajectory(t, s, eta, S_t, S_f, S_b)
+    if extent is None:
+        extent = section_extent(s[active], eta[active], S_t, S_f, S_b) if active.any() else (0.0, 1.0, -S_b, 0.0)
+    x_min, x_max = extent[:2]
+    x = x_min + (x_max - x_min) * (np.arange(nx) + 0.5) / nx
+
+    thickness = np.empty((t.size, nx))
+    for block in _column_blocks(nx, t.size + 1, memory_budget):
+        thickness[:, block] = np.diff(deposit_surfaces(x[block], s, eta, active, S_t, S_f, S_b), axis=0)
+    facies = np.where(x < s[:, None], 1, 2).astype(np.int8)
+    facies[thickness <= 1e-12 * max(np.abs(eta).max(), 1.0)] = 0
+    return {'x': x, 't': t, 'thickness': thickness, 'facies': facies}
+
+# ----------------------
+# Rendering
+# ----------------------
+def section_figure(section, eta_final=None, max_cells=600, title="Synthetic Stratigraphy"):
+    """Heatmap of deposition age over the section, with the basement and final surface."""
+    x, z, age = section['x'], section['z'], section['age']
+    sx, sz = display_stride(x.size, max_cells), display_stride(z.size, max_cells)
+    fig = go.Figure(go.Heatmap(x=x[::sx], y=z[::sz], z=age[::sz, ::sx], colorscale='Turbo', colorbar=dict(title="Age (t)"), hoverongaps=False))
+    fig.add_trace(go.Scatter(x=x, y=section['surface'], mode='lines', line=dict(color='black', width=2), name="Deposit surface"))
+    if eta_final is not None:
+        fig.add_hline(y=eta_final, line=dict(color='royalblue', dash='dash'), annotation_text="Final sea level")
+    fig.update_layout(title=title, xaxis_title="Distance (x)", yaxis_title="Elevation (z)", template="plotly_white")
+    return fig
+
+
+def wheeler_figure(wheeler, s=None, max_cells=600, title="Wheeler Diagram"):
+    """Facies over (x, t): hiatus, topset and foreset deposition, with the shoreline trajectory."""
+    x, t, facies = wheeler['x'], wheeler['t'], wheeler['facies']
+    sx, st_ = display_stride(x.size, max_cells), display_stride(t.size, max_cells)
+    colorscale = [[0, 'whitesmoke'], [0.33, 'whitesmoke'], [0.33, 'sandybrown'], [0.67, 'sandybrown'], [0.67, 'steelblue'], [1, 'steelblue']]
+    fig = go.Figure(go.Heatmap(x=x[::sx], y=t[::st_], z=facies[::st_, ::sx], zmin=0, zmax=2, colorscale=colorscale,
+                               colorbar=dict(tickvals=[1 / 3, 1, 5 / 3], ticktext=[FACIES[k].capitalize() for k in range(3)])))
+    if s is not None:
+        fig.add_trace(go.Scatter(x=s, y=t, mode='lines', line=dict(color='black', width=2), name="Shoreline"))
+    fig.update_layout(title=title, xaxis_title="Distance (x)", yaxis_title="Time (t)", template="plotly_white")
+    return fig
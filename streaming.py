@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+from forcing import Forcing
+from shoreline import as_columns, sea_level_batch, shoreline_location_volume, shoreline_location_advanced_volume
+from supply import cumulative_supply
+from sweep import check_model, chunk_rows
+
+# ----------------------
+# Chunked Evaluation
+# ----------------------
+def stream_model(model, tmax, n_points, params=None, forcing=None, supply=None, chunk_size=None, memory_budget=64 * 2**20):
+    """Evaluates a model on np.linspace(0, tmax, n_points) one time chunk at a time.
+
+    Yields (t_chunk, eta_chunk, X_chunk) with eta and X of shape (N, B); for the advanced
+    model X is the shoreline s (NaN on infeasible rows). params maps the keyword names of
+    run_simple_batch / run_advanced_batch to scalars or (N,) arrays (page defaults
+    otherwise). forcing (a forcing.Forcing or any callable t -> eta) replaces the
+    Z0/Zdot/sinusoid parameters and supply (a supply history) replaces Qs / q_s; the
+    cumulative supply is carried across chunk boundaries. Neither the time axis nor the
+    trajectories are ever materialized in full: peak memory follows chunk_size (by default
+    derived from memory_budget), not n_points.
+    """
+    _, defaults = check_model(model, params or {})
+    params = {**defaults, **(params or {})}
+    supply_name = 'Qs' if model == 'simple' else 'q_s'
+    n_rows = max(np.size(v) for v in params.values())
+    if chunk_size is None:
+        # chunk_rows sizes a block of rows of length n_time; here the rows are the N scenarios
+        chunk_size = chunk_rows(n_rows, memory_budget)
+    dt = tmax / (n_points - 1) if n_points > 1 else 0.0
+    forcing_params = [params[name] for name in ('Z0', 'Zdot', 'A1', 'P1', 'A2', 'P2')]
+
+    carry_t, carry_V = None, 0.0
+    for lo in range(0, n_points, chunk_size):
+        hi = min(lo + chunk_size, n_points)
+        t = dt * np.arange(lo, hi)
+        if hi == n_points:
+            t[-1] = tmax
+        if forcing is None:
+            eta = sea_level_batch(t, *forcing_params)
+        elif isinstance(forcing, Forcing):
+            eta = np.atleast_2d(forcing.evaluate(t, memoize=False))
+        else:
+            eta = np.atleast_2d(forcing(t))
+
+        if supply is None:
+            V, = as_columns(params[supply_name])
+            V = V * t
+        else:
+            # Integrate from the last sample of the previous chunk and carry the total
+            t_ext = t if carry_t is None else np.concatenate([[carry_t], t])
+            V = carry_V + cumulative_supply(supply, t_ext)[:, -t.size:]
+            carry_t, carry_V = t[-1], V[:, -1:]
+
+        if model == 'simple':
+            X = shoreline_location_volume(V, eta, t)
+        else:
+            X, _ = shoreline_location_advanced_volume(V, eta, t, params['S_t'], params['S_f'], params['S_b'])
+        yield t, np.broadcast_to(eta, X.shape), X
+
+# ----------------------
+# Stream Consumers
+# ----------------------
+def decimate(stream, tmax, n_buckets=1000):
+    """Min/max envelope of a stream in n_buckets equal time buckets, for plotting long runs.
+
+    Returns a dict with the bucket start times 't' and (N, n_buckets) arrays 'eta_min',
+    'eta_max', 'X_min' and 'X_max' (NaN-aware), so peaks survive the decimation.
+    """
+    out = None
+    edges = np.linspace(0, tmax, n_buckets + 1)
+    for t, eta, X in stream:
+        if out is None:
+            out = {f'{name}_{stat}': np.full((X.shape[0], n_buckets), np.nan) for name in ('eta', 'X') for stat in ('min', 'max')}
+        bucket = np.clip(np.searchsorted(edges, t, side='right') - 1, 0, n_buckets - 1)
+        # Chunks are contiguous in time, so each bucket is one run of samples
+        starts = np.flatnonzero(np.r_[True, np.diff(bucket) > 0])
+        ids = bucket[starts]
+        for name, values in (('eta', eta), ('X', X)):
+            for stat, reduce in (('min', np.fmin), ('max', np.fmax)):
+                block = out[f'{name}_{stat}']
+                block[:, ids] = reduce(block[:, ids], reduce.reduceat(values, starts, axis=1))
+    if out is None:
+        raise ValueError("Empty stream")
+    return {'t': edges[:-1], **out}
+
+
+def write_stream(stream, directory, n_points):
+    """Writes a stream of n_points samples to t.npy, eta.npy and X.npy in directory.
+
+    The files are memory-mapped .npy arrays filled chunk by chunk; returns their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, f'{name}.npy') for name in ('t', 'eta', 'X')}
+    arrays, pos = None, 0
+    for t, eta, X in stream:
+        if arrays is None:
+            arrays = {
+                't': np.lib.format.open_memmap(paths['t'], mode='w+', shape=(n_points,)),
+                'eta': np.lib.format.open_memmap(paths['eta'], mode='w+', shape=(X.shape[0], n_points)),
+                'X': np.lib.format.open_memmap(paths['X'], mode='w+', shape=(X.shape[0], n_points)),
+            }
+        arrays['t'][pos:pos + t.size] = t
+        arrays['eta'][:, pos:pos + t.size] = eta
+        arrays['X'][:, pos:pos + t.size] = X
+        pos += t.size
+    if arrays is None or pos != n_points:
+        raise ValueError(f"Stream produced {pos} samples, expected {n_points}")
+    for array in arrays.values():
+        array.flush()
+    return paths
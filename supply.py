@@ -0,0 +1,72 @@
+import numpy as np
+
+from shoreline import as_columns, sea_level_batch, shoreline_location_volume, shoreline_location_advanced_volume
+
+# ----------------------
+# Supply Histories
+# ----------------------
+# A supply history is a callable t -> Qs(t) returning an (N, T) (or (1, T)) array.
+# Parameters are scalars or (N,) arrays, one value per scenario.
+def constant(Q):
+    """Constant supply, equivalent to the Qs * t term of the closed forms."""
+    Q, = as_columns(Q)
+    return lambda t: Q * np.ones_like(t)
+
+
+def linear(Q0, rate):
+    """Linearly trending supply Q0 + rate * t."""
+    Q0, rate = as_columns(Q0, rate)
+    return lambda t: Q0 + rate * t
+
+
+def pulse(amplitude, start, duration):
+    """Supply pulse of the given amplitude on [start, start + duration)."""
+    amplitude, start, duration = as_columns(amplitude, start, duration)
+    return lambda t: amplitude * ((t >= start) & (t < start + duration))
+
+
+def periodic(amplitude, period, phase=0.0):
+    """Sinusoidal supply variation amplitude * sin(2 pi t / period + phase)."""
+    amplitude, period, phase = as_columns(amplitude, period, phase)
+    return lambda t: amplitude * np.sin(2 * np.pi * t / period + phase)
+
+
+def combine(*components):
+    """Sum of several supply histories, e.g. combine(linear(200, 0.5), pulse(300, 40, 10))."""
+    return lambda t: sum(component(t) for component in components)
+
+# ----------------------
+# Cumulative Volume
+# ----------------------
+def cumulative_supply(supply, t):
+    """Cumulative sediment volume V(t) = integral of Qs from t[0] to t, by the trapezoid rule.
+
+    supply is a scalar, an array of shape (T,) or (N, T), or a supply history callable;
+    t is (T,) or (N, T). Returns an (N, T) array (N = 1 for a single history). For a
+    constant supply this is exactly Qs * t on a time axis starting at 0.
+    """
+    t = np.asarray(t, dtype=float)
+    Q = supply(t) if callable(supply) else supply
+    Q = np.atleast_2d(np.broadcast_to(np.asarray(Q, dtype=float), np.broadcast_shapes(np.shape(Q), t.shape)))
+    V = np.zeros(Q.shape)
+    # Trapezoid areas accumulated in place: V[:, 1:] = cumsum(0.5 * (Q[:-1] + Q[1:]) * dt)
+    np.add(Q[:, 1:], Q[:, :-1], out=V[:, 1:])
+    V[:, 1:] *= 0.5 * np.diff(t, axis=-1)
+    np.cumsum(V[:, 1:], axis=1, out=V[:, 1:])
+    return V
+
+# ----------------------
+# Batched Runs
+# ----------------------
+def run_simple_supply_batch(t, supply, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """run_simple_batch with a time-varying supply history in place of a constant Qs; returns (eta, X)."""
+    eta = sea_level_batch(t, Z0, Zdot, A1, P1, A2, P2)
+    X = shoreline_location_volume(cumulative_supply(supply, t), eta, t)
+    return eta, X
+
+
+def run_advanced_supply_batch(t, supply, S_t, S_f, S_b, Z0, Zdot, A1=0.0, P1=0.0, A2=0.0, P2=0.0):
+    """run_advanced_batch with a time-varying q_s history; returns (eta, s, feasible)."""
+    eta = sea_level_batch(t, Z0, Zdot, A1, P1, A2, P2)
+    s, feasible = shoreline_location_advanced_volume(cumulative_supply(supply, t), eta, t, S_t, S_f, S_b)
+    return eta, s, feasible
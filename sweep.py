@@ -0,0 +1,123 @@
+import numpy as np
+
+from shoreline import run_simple_batch, run_advanced_batch, slope_feasibility
+
+# ----------------------
+# Model Defaults (match the pages' default widget values)
+# ----------------------
+SIMPLE_DEFAULTS = dict(Qs=250.0, Z0=1.0, Zdot=0.3, A1=0.0, P1=0.0, A2=0.0, P2=0.0)
+ADVANCED_DEFAULTS = dict(q_s=250.0, S_t=0.01, S_f=0.1, S_b=0.05, Z0=1.0, Zdot=0.3, A1=0.0, P1=0.0, A2=0.0, P2=0.0)
+
+MODELS = {
+    'simple': (run_simple_batch, SIMPLE_DEFAULTS),
+    'advanced': (run_advanced_batch, ADVANCED_DEFAULTS),
+}
+
+
+def check_model(model, names=()):
+    """(run, defaults) of a model in MODELS; raises ValueError for an unknown model or parameter name."""
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of {sorted(MODELS)}")
+    run, defaults = MODELS[model]
+    unknown = set(names) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for the {model} model: {sorted(unknown)}")
+    return run, defaults
+
+# Rough number of float64 (N, T) arrays alive at once while a chunk is evaluated
+_ARRAYS_PER_ROW = 6
+
+# ----------------------
+# Trajectory Metrics
+# ----------------------
+def final_position(t, X):
+    """Shoreline position at the last time step."""
+    return X[:, -1]
+
+
+def max_position(t, X):
+    """Maximum shoreline position (furthest regression); NaN rows stay NaN."""
+    return np.max(X, axis=1)
+
+
+def time_of_max_position(t, X):
+    """Time at which the shoreline reaches its maximum regression."""
+    idx = np.argmax(X, axis=1)
+    return np.where(np.isnan(X[:, -1]), np.nan, t[idx])
+
+
+def time_of_first_transgression(t, X):
+    """First time the shoreline moves landward (X decreases); NaN if it never does."""
+    retreat = np.diff(X, axis=1) < 0
+    idx = np.argmax(retreat, axis=1)
+    return np.where(retreat.any(axis=1), t[idx + 1], np.nan)
+
+
+METRICS = {
+    'final': final_position,
+    'max': max_position,
+    't_max': time_of_max_position,
+    't_transgression': time_of_first_transgression,
+}
+
+# ----------------------
+# Sweep Engine
+# ----------------------
+def chunk_rows(n_time, memory_budget):
+    """Number of grid cells evaluated per chunk so the chunk fits in memory_budget bytes."""
+    return max(1, int(memory_budget // (n_time * 8 * _ARRAYS_PER_ROW)))
+
+
+def sweep(model, grid, t, fixed=None, metrics=tuple(METRICS), memory_budget=64 * 2**20):
+    """Evaluates a model over the Cartesian product of the parameter axes in grid.
+
+    model is 'simple' or 'advanced'. grid maps parameter names (the keyword names
+    of run_simple_batch / run_advanced_batch) to 1-D value arrays; fixed overrides
+    the remaining defaults. Trajectories are reduced to the requested metrics chunk
+    by chunk, so peak memory is bounded by memory_budget rather than by the grid size.
+    Returns a dict of metric name -> array with shape (len(axis_1), ..., len(axis_k));
+    the advanced model also returns a boolean 'feasible' array, and cells breaking
+    S_t < S_b < S_f are skipped (NaN metrics) rather than evaluated.
+    """
+    fixed = dict(fixed or {})
+    run, defaults = check_model(model, set(grid) | set(fixed))
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+
+    t = np.asarray(t, dtype=float)
+    names = list(grid)
+    axes = [np.asarray(grid[name], dtype=float).ravel() for name in names]
+    shape = tuple(len(a) for a in axes)
+    n_cells = int(np.prod(shape))
+
+    params = {**defaults, **fixed}
+    out = {name: np.empty(n_cells, dtype=float) for name in metrics}
+    if model == 'advanced':
+        out['feasible'] = np.empty(n_cells, dtype=bool)
+
+    step = chunk_rows(t.size, memory_budget)
+    for start in range(0, n_cells, step):
+        stop = min(start + step, n_cells)
+        coords = np.unravel_index(np.arange(start, stop), shape)
+        for name, axis, idx in zip(names, axes, coords):
+            params[name] = axis[idx]
+        rows = slice(start, stop)
+        chunk = params
+        if model == 'advanced':
+            # Infeasible slope triples are rejected before evaluation; their metrics are NaN
+            feasible = np.broadcast_to(slope_feasibility(params['S_t'], params['S_f'], params['S_b']), (stop - start,))
+            out['feasible'][start:stop] = feasible
+            if not feasible.all():
+                for name in metrics:
+                    out[name][start:stop] = np.nan
+                if not feasible.any():
+                    continue
+                keep = np.flatnonzero(feasible)
+                rows = start + keep
+                chunk = {name: value[keep] if np.ndim(value) else value for name, value in params.items()}
+        X = run(t, **chunk)[1]
+        for name in metrics:
+            out[name][rows] = METRICS[name](t, X)
+
+    return {name: values.reshape(shape) for name, values in out.items()}
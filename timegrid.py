@@ -0,0 +1,73 @@
+import numpy as np
+
+# ----------------------
+# Adaptive Time Sampling
+# ----------------------
+def eta_zero_crossings(t, eta):
+    """Times where a sampled eta(t) changes sign, refined by linear interpolation."""
+    t = np.asarray(t, dtype=float)
+    eta = np.asarray(eta, dtype=float)
+    idx = np.flatnonzero(np.signbit(eta[:-1]) != np.signbit(eta[1:]))
+    frac = eta[idx] / (eta[idx] - eta[idx + 1])
+    return t[idx] + frac * (t[idx + 1] - t[idx])
+
+
+def adaptive_time_grid(tmax, shoreline, eta, n_points=500, pilot_factor=8, uniform_share=0.2, proximity=0.02, singular=False):
+    """Non-uniform time axis on [0, tmax] with n_points samples, for the plotting code as-is.
+
+    shoreline and eta are callables t -> array (the model output and the sea level).
+    Points are equidistributed on a monitor function built from a pilot grid of
+    pilot_factor * n_points samples: normalised arc length and curvature of the
+    shoreline curve plus a proximity term that grows as eta approaches 0, where
+    X = Qs t / eta blows up and the validity mask switches on or off. uniform_share of
+    the budget stays uniformly spread, and the exact eta = 0 crossings are included.
+    With singular (the simple model, whose shoreline diverges at eta = 0) the crossings
+    are left out instead, and no sample lies closer to eta = 0 than the samples of the
+    uniform grid, so the shoreline peaks no higher than on np.linspace. Falls back to np.linspace when the shoreline is not finite (e.g. invalid slopes).
+    """
+    uniform = np.linspace(0, tmax, n_points)
+    pilot = np.linspace(0, tmax, pilot_factor * n_points)
+    y = np.asarray(shoreline(pilot), dtype=float)
+    e = np.asarray(eta(pilot), dtype=float)
+    if tmax <= 0 or not np.all(np.isfinite(y)) or not np.all(np.isfinite(e)):
+        return uniform
+
+    y_scale = np.ptp(y) or 1.0
+    e_scale = np.abs(e).max() or 1.0
+    dt = np.diff(pilot) / tmax
+    dy = np.diff(y) / y_scale
+    arc = np.hypot(dt, dy)
+    bend = np.abs(np.diff(dy))
+    curvature = np.concatenate([[bend[0]], 0.5 * (bend[:-1] + bend[1:]), [bend[-1]]]) if bend.size else np.zeros_like(dt)
+    e_mid = 0.5 * (e[:-1] + e[1:]) / e_scale
+    near_zero = dt * proximity / (np.abs(e_mid) + proximity)
+
+    monitor = arc + curvature + near_zero
+    monitor = (1 - uniform_share) * monitor / monitor.sum() + uniform_share * dt / dt.sum()
+    levels = np.concatenate([[0.0], np.cumsum(monitor)])
+    levels /= levels[-1]
+    t = np.interp(np.linspace(0, 1, n_points), levels, pilot)
+
+    crossings = eta_zero_crossings(pilot, e)
+    if singular:
+        depth = np.abs(np.asarray(eta(uniform), dtype=float))
+        floor = depth[depth > 0].min() if crossings.size and np.any(depth > 0) else 0.0
+        allowed = lambda t: np.abs(np.asarray(eta(t), dtype=float)) >= floor
+        t = t[allowed(t) | (t == 0) | (t == tmax)]
+    else:
+        # Swap the samples nearest to each eta = 0 crossing for the crossing itself
+        if crossings.size and n_points > 2:
+            nearest = np.clip(np.searchsorted(t, crossings), 1, n_points - 2)
+            t[nearest] = crossings
+    t = np.unique(t)
+    while t.size < n_points:
+        # Refill the budget at the midpoints of the widest gaps (away from a singularity)
+        mid = 0.5 * (t[:-1] + t[1:])
+        gaps = np.where(allowed(mid), np.diff(t), 0.0) if singular else np.diff(t)
+        widest = np.argsort(gaps)[::-1][:n_points - t.size]
+        widest = widest[gaps[widest] > 0]
+        if widest.size == 0:
+            break
+        t = np.sort(np.concatenate([t, mid[widest]]))
+    t[0], t[-1] = 0.0, tmax
+    return t
@@ -0,0 +1,140 @@
+import numpy as np
+
+from shoreline import shoreline_location, shoreline_location_advanced
+
+try:
+    import numba
+except ImportError:  # numba is in requirements.txt; without it the summary uses a few NumPy reductions
+    numba = None
+
+# ----------------------
+# Fused Summary Pass
+# ----------------------
+def _summarize_loop(t, eta, X, turning):
+    """One pass over a trajectory: eta/X extrema, valid count and turning points of X.
+
+    Writes the turning point indices into turning and returns (eta_min, eta_max, X_min,
+    X_max, n_valid, n_turning). NaN samples are skipped; extrema of an all-NaN array are NaN.
+    """
+    eta_min = eta_max = X_min = X_max = np.nan
+    n_valid = 0
+    n_turning = 0
+    last_sign = 0
+    for k in range(t.size):
+        e = eta[k]
+        x = X[k]
+        if e == e:
+            if not (e >= eta_min):
+                eta_min = e
+            if not (e <= eta_max):
+                eta_max = e
+        if x == x:
+            if not (x >= X_min):
+                X_min = x
+            if not (x <= X_max):
+                X_max = x
+            if e > 0 and t[k] > 0:
+                n_valid += 1
+        if k > 0:
+            step = x - X[k - 1]
+            sign = 1 if step > 0 else (-1 if step < 0 else 0)
+            if sign != 0:
+                if last_sign != 0 and sign != last_sign:
+                    turning[n_turning] = k - 1
+                    n_turning += 1
+                last_sign = sign
+    return eta_min, eta_max, X_min, X_max, n_valid, n_turning
+
+
+def _summarize_numpy(t, eta, X, turning):
+    finite_eta = eta[np.isfinite(eta)]
+    finite_X = X[np.isfinite(X)]
+    eta_min, eta_max = (finite_eta.min(), finite_eta.max()) if finite_eta.size else (np.nan, np.nan)
+    X_min, X_max = (finite_X.min(), finite_X.max()) if finite_X.size else (np.nan, np.nan)
+    n_valid = int(np.count_nonzero(np.isfinite(X) & (eta > 0) & (t > 0)))
+    # Turning points: sign changes of the non-zero steps of X (flat stretches are skipped)
+    step = np.nan_to_num(np.sign(np.diff(X)))
+    moving = np.flatnonzero(step != 0)
+    # A turn is reported at the sample where the first step of the new direction starts
+    flips = moving[1:][step[moving[1:]] != step[moving[:-1]]]
+    turning[:flips.size] = flips
+    return eta_min, eta_max, X_min, X_max, n_valid, flips.size
+
+
+if numba is not None:
+    _summarize = numba.njit(cache=True)(_summarize_loop)
+else:
+    _summarize = _summarize_numpy
+
+# ----------------------
+# Trajectory Results
+# ----------------------
+class Trajectory:
+    """One model run (t, eta and shoreline X, or s for the advanced model) with lazy summaries.
+
+    Extrema, final values, turning points and the validity fraction are computed together
+    on first access, in one fused pass, and memoized. band optionally holds the envelope
+    dict returned by ensemble.envelope, which widens range() for axis unification; summary
+    may pass in a previously computed summary (e.g. from the result store). key is the
+    result digest of a cached scenario (results.py), None for ad hoc trajectories.
+    """
+    __slots__ = ('t', 'eta', 'X', 'band', 'key', '_summary', '_ranges')
+
+    def __init__(self, t, eta, X, band=None, summary=None, key=None):
+        self.t = np.asarray(t, dtype=float)
+        self.eta = np.asarray(eta, dtype=float)
+        self.X = np.asarray(X, dtype=float)
+        self.band = band
+        self.key = key
+        self._summary = summary
+        self._ranges = {}
+
+    @property
+    def s(self):
+        """The shoreline under the advanced model's name."""
+        return self.X
+
+    @property
+    def summary(self):
+        """Dict of eta_min, eta_max, X_min, X_max, final_eta, final_X, turning_points and valid_fraction."""
+        if self._summary is None:
+            turning = np.empty(max(self.t.size, 1), dtype=np.int64)
+            eta_min, eta_max, X_min, X_max, n_valid, n_turning = _summarize(self.t, self.eta, self.X, turning)
+            self._summary = {
+                'eta_min': float(eta_min), 'eta_max': float(eta_max),
+                'X_min': float(X_min), 'X_max': float(X_max),
+                'final_eta': float(self.eta[-1]) if self.eta.size else np.nan,
+                'final_X': float(self.X[-1]) if self.X.size else np.nan,
+                'turning_points': turning[:n_turning].copy(),
+                'valid_fraction': n_valid / self.t.size if self.t.size else 0.0,
+            }
+        return self._summary
+
+    def range(self, name):
+        """(min, max) of 'eta' or 'X' including the envelope band, 0 where nothing is finite."""
+        if name not in self._ranges:
+            lo, hi = self.summary[f'{name}_min'], self.summary[f'{name}_max']
+            if self.band:
+                band = self.band[name] if name in self.band else self.band['s']
+                lo = np.fmin(lo, np.fmin.reduce([np.fmin.reduce(b) for b in band]))
+                hi = np.fmax(hi, np.fmax.reduce([np.fmax.reduce(b) for b in band]))
+            self._ranges[name] = (0.0 if np.isnan(lo) else float(lo), 0.0 if np.isnan(hi) else float(hi))
+        return self._ranges[name]
+
+
+def shared_range(trajectories, name):
+    """Common (min, max) of 'eta' or 'X' over several trajectories, for unified axes."""
+    ranges = [trajectory.range(name) for trajectory in trajectories]
+    return min(lo for lo, _ in ranges), max(hi for _, hi in ranges)
+
+
+def simple_trajectory(Qs, eta, t, band=None, key=None):
+    """shoreline_location wrapped in a Trajectory."""
+    eta = eta(t) if callable(eta) else eta
+    return Trajectory(t, eta, shoreline_location(Qs, eta, t), band, key=key)
+
+
+def advanced_trajectory(q_s, eta, t, S_t, S_f, S_b, band=None, key=None):
+    """shoreline_location_advanced wrapped in a Trajectory."""
+    eta = eta(t) if callable(eta) else eta
+    return Trajectory(t, eta, shoreline_location_advanced(q_s, eta, t, S_t, S_f, S_b), band, key=key)